@@ -0,0 +1,55 @@
+"""store masked proxy url alongside proxy_url
+
+Revision ID: b7c8d9e0f1a2
+Revises: a6b7c8d9e0f1
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+from urllib.parse import urlparse, urlunparse
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c8d9e0f1a2'
+down_revision: Union[str, None] = 'a6b7c8d9e0f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _mask_url(url: str) -> str:
+    # Snapshot of ProxyManager.mask_url at the time of this migration
+    parsed = urlparse(url)
+    if parsed.username:
+        masked_user = parsed.username[:2] + "***"
+        masked_pass = "***" if parsed.password else ""
+        netloc = f"{masked_user}:{masked_pass}@{parsed.hostname}"
+        if parsed.port:
+            netloc += f":{parsed.port}"
+        return urlunparse((parsed.scheme, netloc, parsed.path, "", "", ""))
+    return url
+
+
+def upgrade() -> None:
+    op.add_column('proxy_configs', sa.Column('proxy_url_masked', sa.String(length=500), nullable=True))
+
+    proxy_configs = sa.table(
+        'proxy_configs',
+        sa.column('id', sa.Uuid()),
+        sa.column('proxy_url', sa.String()),
+        sa.column('proxy_url_masked', sa.String()),
+    )
+    conn = op.get_bind()
+    for row in conn.execute(sa.select(proxy_configs.c.id, proxy_configs.c.proxy_url)):
+        conn.execute(
+            proxy_configs.update()
+            .where(proxy_configs.c.id == row.id)
+            .values(proxy_url_masked=_mask_url(row.proxy_url))
+        )
+
+    op.alter_column('proxy_configs', 'proxy_url_masked', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('proxy_configs', 'proxy_url_masked')
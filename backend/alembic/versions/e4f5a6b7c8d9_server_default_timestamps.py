@@ -0,0 +1,36 @@
+"""server-side defaults for created_at/updated_at
+
+Revision ID: e4f5a6b7c8d9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f5a6b7c8d9'
+down_revision: Union[str, None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = (
+    ('users', 'created_at'),
+    ('users', 'updated_at'),
+    ('api_keys', 'created_at'),
+    ('proxy_configs', 'created_at'),
+    ('schedules', 'created_at'),
+    ('schedules', 'updated_at'),
+)
+
+
+def upgrade() -> None:
+    for table, column in _COLUMNS:
+        op.alter_column(table, column, server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    for table, column in _COLUMNS:
+        op.alter_column(table, column, server_default=None)
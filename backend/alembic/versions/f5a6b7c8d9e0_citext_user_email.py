@@ -0,0 +1,54 @@
+"""store user emails lowercased in a citext column
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-15 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a6b7c8d9e0'
+down_revision: Union[str, None] = 'e4f5a6b7c8d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Emails used to be unique case-sensitively, so "Foo@x.com" and
+    # "foo@x.com" may both exist. Those accounts have to be merged or
+    # renamed by hand; refuse to upgrade rather than pick one silently.
+    collisions = op.get_bind().execute(sa.text(
+        "SELECT lower(trim(email)) AS normalized, "
+        "string_agg(id::text || ' <' || email || '>', ', ' ORDER BY created_at) AS accounts "
+        "FROM users GROUP BY lower(trim(email)) HAVING count(*) > 1"
+    )).all()
+    if collisions:
+        details = "\n".join(f"  {row.normalized}: {row.accounts}" for row in collisions)
+        raise RuntimeError(
+            "Cannot make users.email case-insensitive: these accounts differ only "
+            "in case or surrounding whitespace. Merge or rename them, then rerun "
+            f"the migration.\n{details}"
+        )
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS citext')
+    op.execute('UPDATE users SET email = lower(trim(email))')
+    op.alter_column(
+        'users', 'email',
+        type_=postgresql.CITEXT(),
+        existing_type=sa.String(length=255),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'users', 'email',
+        type_=sa.String(length=255),
+        existing_type=postgresql.CITEXT(),
+        existing_nullable=False,
+    )
@@ -1,9 +1,10 @@
-from fastapi import Depends, Header
+from fastapi import Depends, Header, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.exceptions import AuthenticationError
 from app.core.security import decode_access_token
+from app.models.job import Job
 from app.models.user import User
 from app.services.auth import get_user_by_api_key
 
@@ -46,3 +47,19 @@ async def get_current_user(
         raise AuthenticationError("User not found")
 
     return user
+
+
+def job_etag(job: Job) -> str:
+    """Weak ETag for a job status payload.
+
+    Status responses only change when the job's status or page counters move,
+    so polling clients can revalidate without us reloading the result rows.
+    """
+    return f'W/"{job.id}-{job.status}-{job.completed_pages}-{job.total_pages}"'
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """Return a 304 response if the client already has this ETag."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -7,15 +7,16 @@ import re
 import zipfile
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, job_etag, not_modified
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, RateLimitError, BadRequestError
 from app.core.rate_limiter import check_rate_limit
+from app.core.serialization import decode_links_detail, status_json_response
 from app.core.metrics import batch_jobs_total
 from app.config import settings
 from app.models.job import Job
@@ -57,7 +58,8 @@ def _build_batch_dicts(results) -> list[dict]:
         structured_data = meta.pop("structured_data", None)
         headings = meta.pop("headings", None)
         images = meta.pop("images", None)
-        links_detail = meta.pop("links_detail", None)
+        meta.pop("links_detail", None)
+        links_detail = decode_links_detail(r)
         if meta:
             page["metadata"] = meta
         if structured_data:
@@ -130,6 +132,7 @@ async def start_batch_scrape(
 @router.get("/{job_id}", response_model=BatchStatusResponse)
 async def get_batch_status(
     job_id: str,
+    request: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -138,7 +141,13 @@ async def get_batch_status(
     if not job or job.user_id != user.id or job.type != "batch":
         raise NotFoundError("Batch job not found")
 
+    etag = job_etag(job)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     data = None
+    results = []
     if job.status in ("pending", "running", "completed"):
         result = await db.execute(
             select(JobResult).where(JobResult.job_id == job.id).order_by(JobResult.created_at)
@@ -183,7 +192,7 @@ async def get_batch_status(
                 )
             )
 
-    return BatchStatusResponse(
+    payload = BatchStatusResponse(
         success=True,
         job_id=job.id,
         status=job.status,
@@ -191,7 +200,8 @@ async def get_batch_status(
         completed_urls=job.completed_pages or 0,
         data=data,
         error=job.error,
-    )
+    ).model_dump(mode="json")
+    return status_json_response(payload, results, headers={"ETag": etag})
 
 
 @router.get("/{job_id}/export")
@@ -7,15 +7,16 @@ import re
 import zipfile
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, job_etag, not_modified
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, RateLimitError
 from app.core.rate_limiter import check_rate_limit
+from app.core.serialization import decode_links_detail, ndjson_line, status_json_response
 from app.config import settings
 from app.models.job import Job
 from app.models.job_result import JobResult
@@ -59,7 +60,8 @@ def _build_result_dicts(results) -> list[dict]:
         structured_data = meta.pop("structured_data", None)
         headings = meta.pop("headings", None)
         images = meta.pop("images", None)
-        links_detail = meta.pop("links_detail", None)
+        meta.pop("links_detail", None)
+        links_detail = decode_links_detail(r)
 
         if meta:
             page["metadata"] = meta
@@ -76,6 +78,53 @@ def _build_result_dicts(results) -> list[dict]:
     return pages
 
 
+def _page_from_result(r: JobResult) -> CrawlPageData:
+    """Build the API representation of one stored crawl page."""
+    page_metadata = None
+    structured_data = None
+    headings = None
+    images = None
+    links_detail = None
+
+    if r.metadata_:
+        meta = dict(r.metadata_)
+        # Pop extended fields that we stored inside metadata_
+        structured_data = meta.pop("structured_data", None)
+        headings = meta.pop("headings", None)
+        images = meta.pop("images", None)
+        links_detail = meta.pop("links_detail", None)
+
+        # Build PageMetadata from remaining fields
+        page_metadata = PageMetadata(
+            title=meta.get("title"),
+            description=meta.get("description"),
+            language=meta.get("language"),
+            source_url=meta.get("source_url", r.url),
+            status_code=meta.get("status_code", 200),
+            word_count=meta.get("word_count", 0),
+            reading_time_seconds=meta.get("reading_time_seconds", 0),
+            content_length=meta.get("content_length", 0),
+            og_image=meta.get("og_image"),
+            canonical_url=meta.get("canonical_url"),
+            favicon=meta.get("favicon"),
+            robots=meta.get("robots"),
+            response_headers=meta.get("response_headers"),
+        )
+
+    return CrawlPageData(
+        url=r.url,
+        markdown=r.markdown,
+        html=r.html,
+        links=r.links,
+        links_detail=links_detail,
+        screenshot=r.screenshot_url,  # base64 data stored here
+        structured_data=structured_data,
+        headings=headings,
+        images=images,
+        metadata=page_metadata,
+    )
+
+
 @router.post("", response_model=CrawlStartResponse)
 async def start_crawl(
     request: CrawlRequest,
@@ -118,6 +167,7 @@ async def start_crawl(
 @router.get("/{job_id}", response_model=CrawlStatusResponse)
 async def get_crawl_status(
     job_id: str,
+    request: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -126,64 +176,23 @@ async def get_crawl_status(
     if not job or job.user_id != user.id:
         raise NotFoundError("Crawl job not found")
 
+    etag = job_etag(job)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     # Get results (return partial results while still running)
     data = None
+    results = []
     if job.status in ("pending", "running", "completed", "started"):
         result = await db.execute(
             select(JobResult).where(JobResult.job_id == job.id).order_by(JobResult.created_at)
         )
         results = result.scalars().all()
 
-        data = []
-        for r in results:
-            # Extract base metadata fields
-            page_metadata = None
-            structured_data = None
-            headings = None
-            images = None
-            links_detail = None
-
-            if r.metadata_:
-                meta = dict(r.metadata_)
-                # Pop extended fields that we stored inside metadata_
-                structured_data = meta.pop("structured_data", None)
-                headings = meta.pop("headings", None)
-                images = meta.pop("images", None)
-                links_detail = meta.pop("links_detail", None)
-
-                # Build PageMetadata from remaining fields
-                page_metadata = PageMetadata(
-                    title=meta.get("title"),
-                    description=meta.get("description"),
-                    language=meta.get("language"),
-                    source_url=meta.get("source_url", r.url),
-                    status_code=meta.get("status_code", 200),
-                    word_count=meta.get("word_count", 0),
-                    reading_time_seconds=meta.get("reading_time_seconds", 0),
-                    content_length=meta.get("content_length", 0),
-                    og_image=meta.get("og_image"),
-                    canonical_url=meta.get("canonical_url"),
-                    favicon=meta.get("favicon"),
-                    robots=meta.get("robots"),
-                    response_headers=meta.get("response_headers"),
-                )
-
-            data.append(
-                CrawlPageData(
-                    url=r.url,
-                    markdown=r.markdown,
-                    html=r.html,
-                    links=r.links,
-                    links_detail=links_detail,
-                    screenshot=r.screenshot_url,  # base64 data stored here
-                    structured_data=structured_data,
-                    headings=headings,
-                    images=images,
-                    metadata=page_metadata,
-                )
-            )
+        data = [_page_from_result(r) for r in results]
 
-    return CrawlStatusResponse(
+    payload = CrawlStatusResponse(
         success=True,
         job_id=job.id,
         status=job.status,
@@ -191,7 +200,39 @@ async def get_crawl_status(
         completed_pages=job.completed_pages,
         data=data,
         error=job.error,
-    )
+    ).model_dump(mode="json")
+    return status_json_response(payload, results, headers={"ETag": etag})
+
+
+@router.get("/{job_id}/stream")
+async def stream_crawl_results(
+    job_id: str,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream crawl pages as NDJSON, one CrawlPageData object per line.
+
+    Rows are read from a server-side cursor and written as they arrive, so
+    large crawls never have their full result list built in memory.
+    """
+    job = await db.get(Job, UUID(job_id))
+    if not job or job.user_id != user.id:
+        raise NotFoundError("Crawl job not found")
+
+    # Streams through the request session: FastAPI >= 0.118 (the floor in
+    # requirements.txt) keeps yield-dependencies open until the body is sent
+    async def generate():
+        rows = await db.stream_scalars(
+            select(JobResult).where(JobResult.job_id == job.id).order_by(JobResult.created_at)
+        )
+        try:
+            async for r in rows:
+                yield ndjson_line(_page_from_result(r).model_dump(mode="json"), r)
+        finally:
+            # Release the cursor even if the client disconnects mid-stream
+            await rows.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 @router.delete("/{job_id}")
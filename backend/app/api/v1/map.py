@@ -14,6 +14,7 @@ from app.api.deps import get_current_user
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, RateLimitError
 from app.core.rate_limiter import check_rate_limit
+from app.core.serialization import OrjsonResponse
 from app.config import settings
 from app.models.job import Job
 from app.models.job_result import JobResult
@@ -88,7 +89,7 @@ async def map_site(
         )
 
 
-@router.get("/{job_id}")
+@router.get("/{job_id}", response_class=OrjsonResponse)
 async def get_map_status(
     job_id: str,
     user: User = Depends(get_current_user),
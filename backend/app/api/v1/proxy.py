@@ -2,7 +2,7 @@ import logging
 from uuid import UUID
 
 from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
@@ -22,17 +22,6 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def _mask_and_respond(config: ProxyConfig) -> ProxyResponse:
-    return ProxyResponse(
-        id=config.id,
-        proxy_url_masked=ProxyManager.mask_url(config.proxy_url),
-        proxy_type=config.proxy_type,
-        label=config.label,
-        is_active=config.is_active,
-        created_at=config.created_at,
-    )
-
-
 @router.post("/proxies", response_model=ProxyListResponse)
 async def add_proxies(
     request: ProxyBulkCreateRequest,
@@ -40,23 +29,25 @@ async def add_proxies(
     db: AsyncSession = Depends(get_db),
 ):
     """Add one or more proxies (bulk). Each line is a proxy URL."""
-    added = []
-    for proxy_url in request.proxies:
-        proxy_url = proxy_url.strip()
-        if not proxy_url:
-            continue
-        config = ProxyConfig(
-            user_id=user.id,
-            proxy_url=proxy_url,
-            proxy_type=request.proxy_type,
-        )
-        db.add(config)
-        added.append(config)
+    rows = [
+        {
+            "user_id": user.id,
+            "proxy_url": proxy_url,
+            "proxy_url_masked": ProxyManager.mask_url(proxy_url),
+            "proxy_type": request.proxy_type,
+        }
+        for proxy_url in (p.strip() for p in request.proxies)
+        if proxy_url
+    ]
+    if not rows:
+        return ProxyListResponse(proxies=[], total=0)
 
-    await db.flush()
+    # One multi-row INSERT ... RETURNING instead of an ORM object per proxy
+    result = await db.execute(insert(ProxyConfig).values(rows).returning(ProxyConfig))
+    added = result.scalars().all()
 
     return ProxyListResponse(
-        proxies=[_mask_and_respond(c) for c in added],
+        proxies=[ProxyResponse.model_validate(c) for c in added],
         total=len(added),
     )
 
@@ -75,7 +66,7 @@ async def list_proxies(
     configs = result.scalars().all()
 
     return ProxyListResponse(
-        proxies=[_mask_and_respond(c) for c in configs],
+        proxies=[ProxyResponse.model_validate(c) for c in configs],
         total=len(configs),
     )
 
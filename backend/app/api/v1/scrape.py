@@ -18,6 +18,11 @@ from app.api.deps import get_current_user
 from app.core.database import get_db
 from app.core.exceptions import BadRequestError, NotFoundError
 from app.core.rate_limiter import check_rate_limit
+from app.core.serialization import (
+    decode_links_detail,
+    encode_links_detail,
+    status_json_response,
+)
 from app.core.metrics import scrape_requests_total
 from app.config import settings
 from app.models.job import Job
@@ -57,7 +62,8 @@ def _build_result_dicts(results) -> list[dict]:
         structured_data = meta.pop("structured_data", None)
         headings = meta.pop("headings", None)
         images = meta.pop("images", None)
-        links_detail = meta.pop("links_detail", None)
+        meta.pop("links_detail", None)
+        links_detail = decode_links_detail(r)
 
         if meta:
             page["metadata"] = meta
@@ -120,7 +126,7 @@ async def scrape(
                 prompt=request.extract.prompt,
                 schema=request.extract.schema_,
             )
-            result.extract = extract_result
+            result = result.model_copy(update={"extract": extract_result})
 
         # Persist the result
         metadata_dict = result.metadata.model_dump() if result.metadata else {}
@@ -130,8 +136,6 @@ async def scrape(
             metadata_dict["headings"] = result.headings
         if result.images:
             metadata_dict["images"] = result.images
-        if result.links_detail:
-            metadata_dict["links_detail"] = result.links_detail
 
         job_result = JobResult(
             job_id=job.id,
@@ -141,6 +145,7 @@ async def scrape(
             links=result.links,
             extract=result.extract,
             metadata_=metadata_dict,
+            links_detail_json=encode_links_detail(result.links_detail),
             screenshot_url=result.screenshot,
         )
         db.add(job_result)
@@ -226,7 +231,7 @@ async def get_scrape_status(
             "metadata": page_metadata.model_dump() if page_metadata else None,
         })
 
-    return {
+    return status_json_response({
         "success": True,
         "job_id": str(job.id),
         "status": job.status,
@@ -234,7 +239,7 @@ async def get_scrape_status(
         "completed_pages": job.completed_pages,
         "data": data,
         "error": job.error,
-    }
+    }, results)
 
 
 @router.get("/{job_id}/export")
@@ -7,15 +7,16 @@ import re
 import zipfile
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, job_etag, not_modified
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, RateLimitError
 from app.core.rate_limiter import check_rate_limit
+from app.core.serialization import status_json_response
 from app.core.metrics import search_jobs_total
 from app.config import settings
 from app.models.job import Job
@@ -118,6 +119,7 @@ async def start_search(
 @router.get("/{job_id}", response_model=SearchStatusResponse)
 async def get_search_status(
     job_id: str,
+    request: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -126,9 +128,15 @@ async def get_search_status(
     if not job or job.user_id != user.id or job.type != "search":
         raise NotFoundError("Search job not found")
 
+    etag = job_etag(job)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     query = job.config.get("query", "") if job.config else ""
 
     data = None
+    results = []
     if job.status in ("pending", "running", "completed"):
         result = await db.execute(
             select(JobResult).where(JobResult.job_id == job.id).order_by(JobResult.created_at)
@@ -169,7 +177,7 @@ async def get_search_status(
                 )
             )
 
-    return SearchStatusResponse(
+    payload = SearchStatusResponse(
         success=True,
         job_id=job.id,
         status=job.status,
@@ -178,7 +186,8 @@ async def get_search_status(
         completed_results=job.completed_pages,
         data=data,
         error=job.error,
-    )
+    ).model_dump(mode="json")
+    return status_json_response(payload, results, headers={"ETag": etag})
 
 
 @router.get("/{job_id}/export")
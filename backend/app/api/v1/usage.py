@@ -10,11 +10,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
 from app.core.database import get_db
+from app.core.serialization import OrjsonResponse
 from app.models.job import Job
 from app.models.job_result import JobResult
 from app.models.user import User
 
-router = APIRouter()
+router = APIRouter(default_response_class=OrjsonResponse)
 logger = logging.getLogger(__name__)
 
 
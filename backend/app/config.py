@@ -29,6 +29,8 @@ class Settings(BaseSettings):
 
     # Browser Pool
     BROWSER_POOL_SIZE: int = 5
+    BROWSER_CONTEXT_POOL_SIZE: int = 16  # Reusable contexts per browser; 0 = fresh context per page
+    BROWSER_CONTEXT_MAX_PAGES: int = 50  # Pages a pooled context serves before it is replaced; 0 = never
     BROWSER_HEADLESS: bool = True
 
     # Rate Limiting (per minute)
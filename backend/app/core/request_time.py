@@ -0,0 +1,25 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+_REQUEST_NOW: ContextVar[datetime | None] = ContextVar("request_now", default=None)
+
+
+def request_now() -> datetime:
+    """Return the UTC timestamp captured when the current HTTP request started.
+
+    Outside of a request (workers, scripts) this falls back to the current time.
+    """
+    now = _REQUEST_NOW.get()
+    return now if now is not None else datetime.now(timezone.utc)
+
+
+class RequestTimeMiddleware:
+    """Pure ASGI middleware that captures one timestamp per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            _REQUEST_NOW.set(datetime.now(timezone.utc))
+        await self.app(scope, receive, send)
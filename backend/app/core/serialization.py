@@ -0,0 +1,49 @@
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def encode_links_detail(links_detail: dict | None) -> bytes | None:
+    """Serialize links_detail once, at write time, for storage on JobResult."""
+    if not links_detail:
+        return None
+    return orjson.dumps(links_detail)
+
+
+def decode_links_detail(result) -> dict | None:
+    """Read links_detail from a JobResult.
+
+    Rows written before links_detail_json existed keep it inside metadata_.
+    """
+    if result.links_detail_json:
+        return orjson.loads(result.links_detail_json)
+    if result.metadata_:
+        return result.metadata_.get("links_detail")
+    return None
+
+
+def status_json_response(payload: dict, results, headers: dict | None = None) -> Response:
+    """Render a job status payload as JSON.
+
+    Each item in payload["data"] gets its row's stored links_detail bytes
+    spliced in as-is, so the largest per-page field is never decoded or
+    re-encoded on a poll. Items and results must be in the same order.
+    """
+    for item, r in zip(payload.get("data") or (), results):
+        if r.links_detail_json:
+            item["links_detail"] = orjson.Fragment(r.links_detail_json)
+    return Response(orjson.dumps(payload), media_type="application/json", headers=headers)
+
+
+def ndjson_line(item: dict, result) -> bytes:
+    """Encode one status item as an NDJSON line, splicing in stored links_detail."""
+    if result.links_detail_json:
+        item["links_detail"] = orjson.Fragment(result.links_detail_json)
+    return orjson.dumps(item) + b"\n"
@@ -7,7 +7,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import api_router
 from app.api.v1.health import router as health_router
 from app.config import settings
+from app.core.request_time import RequestTimeMiddleware
 from app.services.browser import browser_pool
+from app.services.mapper import close_http_clients
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,6 +31,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down...")
     await browser_pool.shutdown()
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -50,6 +53,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestTimeMiddleware)
 
 # Include API routes
 app.include_router(api_router)
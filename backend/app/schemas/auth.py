@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 
 
 class RegisterRequest(BaseModel):
@@ -9,16 +9,28 @@ class RegisterRequest(BaseModel):
     password: str
     name: str | None = None
 
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, v: str) -> str:
+        return v.strip().lower()
+
 
 class LoginRequest(BaseModel):
     email: str
     password: str
 
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, v: str) -> str:
+        return v.strip().lower()
+
 
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
 
+    model_config = {"frozen": True}
+
 
 class UserResponse(BaseModel):
     id: UUID
@@ -26,7 +38,7 @@ class UserResponse(BaseModel):
     name: str | None
     created_at: datetime
 
-    model_config = {"from_attributes": True}
+    model_config = {"frozen": True, "from_attributes": True}
 
 
 class ApiKeyCreateRequest(BaseModel):
@@ -41,7 +53,7 @@ class ApiKeyResponse(BaseModel):
     last_used_at: datetime | None
     created_at: datetime
 
-    model_config = {"from_attributes": True}
+    model_config = {"frozen": True, "from_attributes": True}
 
 
 class ApiKeyCreatedResponse(ApiKeyResponse):
@@ -3,7 +3,7 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
-from app.schemas.scrape import PageMetadata
+from app.schemas.scrape import PageResult
 
 
 class BatchScrapeItem(BaseModel):
@@ -34,19 +34,11 @@ class BatchStartResponse(BaseModel):
     message: str = "Batch scrape job started"
     total_urls: int = 0
 
+    model_config = {"frozen": True}
 
-class BatchItemResult(BaseModel):
-    url: str
+
+class BatchItemResult(PageResult):
     success: bool
-    markdown: str | None = None
-    html: str | None = None
-    links: list[str] | None = None
-    links_detail: dict | None = None
-    screenshot: str | None = None
-    structured_data: dict | None = None
-    headings: list[dict] | None = None
-    images: list[dict] | None = None
-    metadata: PageMetadata | None = None
     error: str | None = None
 
 
@@ -58,3 +50,5 @@ class BatchStatusResponse(BaseModel):
     completed_urls: int
     data: list[BatchItemResult] | None = None
     error: str | None = None
+
+    model_config = {"frozen": True}
@@ -3,7 +3,7 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
-from app.schemas.scrape import PageMetadata
+from app.schemas.scrape import PageResult
 
 
 class ScrapeOptions(BaseModel):
@@ -36,18 +36,11 @@ class CrawlStartResponse(BaseModel):
     status: str = "started"
     message: str = "Crawl job started"
 
+    model_config = {"frozen": True}
 
-class CrawlPageData(BaseModel):
-    url: str
-    markdown: str | None = None
-    html: str | None = None
-    links: list[str] | None = None
-    links_detail: dict | None = None
-    screenshot: str | None = None
-    structured_data: dict | None = None
-    headings: list[dict] | None = None
-    images: list[dict] | None = None
-    metadata: PageMetadata | None = None
+
+class CrawlPageData(PageResult):
+    pass
 
 
 class CrawlStatusResponse(BaseModel):
@@ -58,3 +51,5 @@ class CrawlStatusResponse(BaseModel):
     completed_pages: int
     data: list[CrawlPageData] | None = None
     error: str | None = None
+
+    model_config = {"frozen": True}
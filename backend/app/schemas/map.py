@@ -16,6 +16,8 @@ class LinkResult(BaseModel):
     lastmod: str | None = None
     priority: float | None = None
 
+    model_config = {"frozen": True}
+
 
 class MapResponse(BaseModel):
     success: bool
@@ -23,3 +25,5 @@ class MapResponse(BaseModel):
     links: list[LinkResult]
     error: str | None = None
     job_id: str | None = None
+
+    model_config = {"frozen": True}
@@ -1,7 +1,9 @@
 from uuid import UUID
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+MAX_BULK_PROXIES = 1000
 
 
 class ProxyCreateRequest(BaseModel):
@@ -14,6 +16,13 @@ class ProxyBulkCreateRequest(BaseModel):
     proxies: list[str]  # List of proxy URLs, one per item
     proxy_type: str = "http"
 
+    @field_validator("proxies")
+    @classmethod
+    def limit_bulk_size(cls, v: list[str]) -> list[str]:
+        if len(v) > MAX_BULK_PROXIES:
+            raise ValueError(f"At most {MAX_BULK_PROXIES} proxies can be added at once")
+        return v
+
 
 class ProxyResponse(BaseModel):
     id: UUID
@@ -23,7 +32,11 @@ class ProxyResponse(BaseModel):
     is_active: bool
     created_at: datetime
 
+    model_config = {"frozen": True, "from_attributes": True}
+
 
 class ProxyListResponse(BaseModel):
     proxies: list[ProxyResponse]
     total: int
+
+    model_config = {"frozen": True}
@@ -38,7 +38,11 @@ class ScheduleResponse(BaseModel):
     created_at: str
     updated_at: str
 
+    model_config = {"frozen": True}
+
 
 class ScheduleListResponse(BaseModel):
     schedules: list[ScheduleResponse]
     total: int
+
+    model_config = {"frozen": True}
@@ -1,6 +1,7 @@
 from typing import Any
 
 from pydantic import BaseModel, HttpUrl
+from typing_extensions import NotRequired, TypedDict
 
 
 class ActionStep(BaseModel):
@@ -32,6 +33,20 @@ class ScrapeRequest(BaseModel):
     use_proxy: bool = False
 
 
+class Heading(TypedDict):
+    level: int
+    text: str
+    id: NotRequired[str]
+
+
+class ImageInfo(TypedDict):
+    src: str
+    alt: str
+    width: NotRequired[str]
+    height: NotRequired[str]
+    loading: NotRequired[str]
+
+
 class PageMetadata(BaseModel):
     title: str | None = None
     description: str | None = None
@@ -47,6 +62,8 @@ class PageMetadata(BaseModel):
     robots: str | None = None
     response_headers: dict[str, str] | None = None
 
+    model_config = {"frozen": True}
+
 
 class ScrapeData(BaseModel):
     markdown: str | None = None
@@ -56,14 +73,35 @@ class ScrapeData(BaseModel):
     links_detail: dict | None = None  # internal/external breakdown with anchor text
     screenshot: str | None = None  # base64
     structured_data: dict | None = None  # JSON-LD, OpenGraph, Twitter Cards
-    headings: list[dict] | None = None  # heading hierarchy
-    images: list[dict] | None = None  # all images with metadata
+    headings: list[Heading] | None = None  # heading hierarchy
+    images: list[ImageInfo] | None = None  # all images with metadata
     extract: dict[str, Any] | None = None
     metadata: PageMetadata
 
+    model_config = {"frozen": True}
+
+
+class PageResult(BaseModel):
+    """Per-page scrape output shared by the crawl, batch and search status schemas."""
+
+    url: str
+    markdown: str | None = None
+    html: str | None = None
+    links: list[str] | None = None
+    links_detail: dict | None = None
+    screenshot: str | None = None
+    structured_data: dict | None = None
+    headings: list[Heading] | None = None
+    images: list[ImageInfo] | None = None
+    metadata: PageMetadata | None = None
+
+    model_config = {"frozen": True}
+
 
 class ScrapeResponse(BaseModel):
     success: bool
     data: ScrapeData | None = None
     error: str | None = None
     job_id: str | None = None
+
+    model_config = {"frozen": True}
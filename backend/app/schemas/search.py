@@ -2,7 +2,7 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
-from app.schemas.scrape import PageMetadata
+from app.schemas.scrape import PageResult
 
 
 class SearchRequest(BaseModel):
@@ -24,21 +24,13 @@ class SearchStartResponse(BaseModel):
     status: str = "started"
     message: str = "Search job started"
 
+    model_config = {"frozen": True}
 
-class SearchResultItem(BaseModel):
-    url: str
+
+class SearchResultItem(PageResult):
     title: str | None = None
     snippet: str | None = None
     success: bool = True
-    markdown: str | None = None
-    html: str | None = None
-    links: list[str] | None = None
-    links_detail: dict | None = None
-    screenshot: str | None = None
-    structured_data: dict | None = None
-    headings: list[dict] | None = None
-    images: list[dict] | None = None
-    metadata: PageMetadata | None = None
     error: str | None = None
 
 
@@ -51,3 +43,5 @@ class SearchStatusResponse(BaseModel):
     completed_results: int = 0
     data: list[SearchResultItem] | None = None
     error: str | None = None
+
+    model_config = {"frozen": True}
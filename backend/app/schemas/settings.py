@@ -19,8 +19,10 @@ class LLMKeyResponse(BaseModel):
     key_preview: str  # masked key like "sk-...abc123"
     created_at: datetime
 
-    model_config = {"from_attributes": True}
+    model_config = {"frozen": True, "from_attributes": True}
 
 
 class LLMKeyListResponse(BaseModel):
     keys: list[LLMKeyResponse]
+
+    model_config = {"frozen": True}
@@ -1,10 +1,10 @@
-from datetime import datetime, timezone
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import exists, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import AuthenticationError, BadRequestError
+from app.core.request_time import request_now
 from app.core.security import (
     hash_password,
     verify_password,
@@ -18,8 +18,7 @@ from app.models.api_key import ApiKey
 
 async def register_user(db: AsyncSession, email: str, password: str, name: str | None = None) -> User:
     # Check if user exists
-    result = await db.execute(select(User).where(User.email == email))
-    if result.scalar_one_or_none():
+    if await db.scalar(select(exists().where(User.email == email))):
         raise BadRequestError("Email already registered")
 
     user = User(
@@ -62,18 +61,20 @@ async def create_api_key_for_user(
 async def get_user_by_api_key(db: AsyncSession, api_key: str) -> User | None:
     key_hash = hash_api_key(api_key)
     result = await db.execute(
-        select(ApiKey).where(ApiKey.key_hash == key_hash, ApiKey.is_active == True)
+        select(User, ApiKey.id)
+        .join(ApiKey, ApiKey.user_id == User.id)
+        .where(ApiKey.key_hash == key_hash, ApiKey.is_active == True)
     )
-    api_key_obj = result.scalar_one_or_none()
-    if not api_key_obj:
+    row = result.first()
+    if not row:
         return None
+    user, api_key_id = row
 
     # Update last used
-    api_key_obj.last_used_at = datetime.now(timezone.utc)
-
-    # Get user
-    result = await db.execute(select(User).where(User.id == api_key_obj.user_id))
-    return result.scalar_one_or_none()
+    await db.execute(
+        update(ApiKey).where(ApiKey.id == api_key_id).values(last_used_at=request_now())
+    )
+    return user
 
 
 async def get_user_api_keys(db: AsyncSession, user_id: UUID) -> list[ApiKey]:
@@ -85,10 +86,8 @@ async def get_user_api_keys(db: AsyncSession, user_id: UUID) -> list[ApiKey]:
 
 async def revoke_api_key(db: AsyncSession, user_id: UUID, key_id: UUID) -> bool:
     result = await db.execute(
-        select(ApiKey).where(ApiKey.id == key_id, ApiKey.user_id == user_id)
+        update(ApiKey)
+        .where(ApiKey.id == key_id, ApiKey.user_id == user_id)
+        .values(is_active=False)
     )
-    api_key = result.scalar_one_or_none()
-    if not api_key:
-        return False
-    api_key.is_active = False
-    return True
+    return result.rowcount > 0
@@ -1,11 +1,17 @@
 import asyncio
 import base64
-import hashlib
 import logging
 import random
 import time
+import weakref
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from urllib.parse import urlparse
 
+import orjson
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 
 from app.config import settings
@@ -16,7 +22,7 @@ logger = logging.getLogger(__name__)
 # Realistic fingerprint data — rotated per-session for diversity
 # ---------------------------------------------------------------------------
 
-CHROME_USER_AGENTS = [
+CHROME_USER_AGENTS = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
@@ -24,18 +30,18 @@ CHROME_USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-]
+)
 
-FIREFOX_USER_AGENTS = [
+FIREFOX_USER_AGENTS = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:126.0) Gecko/20100101 Firefox/126.0",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:126.0) Gecko/20100101 Firefox/126.0",
     "Mozilla/5.0 (X11; Linux x86_64; rv:126.0) Gecko/20100101 Firefox/126.0",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:125.0) Gecko/20100101 Firefox/125.0",
     "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
-]
+)
 
-VIEWPORTS = [
+VIEWPORTS = (
     {"width": 1920, "height": 1080},
     {"width": 1366, "height": 768},
     {"width": 1440, "height": 900},
@@ -43,9 +49,9 @@ VIEWPORTS = [
     {"width": 1680, "height": 1050},
     {"width": 1280, "height": 720},
     {"width": 2560, "height": 1440},
-]
+)
 
-TIMEZONES = [
+TIMEZONES = (
     "America/New_York",
     "America/Chicago",
     "America/Los_Angeles",
@@ -53,10 +59,10 @@ TIMEZONES = [
     "America/Phoenix",
     "Europe/London",
     "Europe/Paris",
-]
+)
 
 # Realistic WebGL renderer strings per GPU vendor
-WEBGL_RENDERERS = [
+WEBGL_RENDERERS = (
     ("Google Inc. (NVIDIA)", "ANGLE (NVIDIA, NVIDIA GeForce GTX 1080 Direct3D11 vs_5_0 ps_5_0, D3D11)"),
     ("Google Inc. (NVIDIA)", "ANGLE (NVIDIA, NVIDIA GeForce RTX 3060 Direct3D11 vs_5_0 ps_5_0, D3D11)"),
     ("Google Inc. (NVIDIA)", "ANGLE (NVIDIA, NVIDIA GeForce RTX 4070 Direct3D11 vs_5_0 ps_5_0, D3D11)"),
@@ -66,10 +72,189 @@ WEBGL_RENDERERS = [
     ("Google Inc. (AMD)", "ANGLE (AMD, AMD Radeon RX 6700 XT Direct3D11 vs_5_0 ps_5_0, D3D11)"),
     ("Google Inc. (Apple)", "ANGLE (Apple, Apple M1, OpenGL 4.1)"),
     ("Google Inc. (Apple)", "ANGLE (Apple, Apple M2, OpenGL 4.1)"),
-]
+)
 
 # Realistic screen color depths
-COLOR_DEPTHS = [24, 24, 24, 30, 32]
+COLOR_DEPTHS = (24, 24, 24, 30, 32)
+
+# UA substring -> (navigator.platform, navigator.oscpu, Sec-Ch-Ua-Platform)
+_PLATFORMS = (
+    ("Win", "Win32", "Windows NT 10.0; Win64; x64", '"Windows"'),
+    ("Mac", "MacIntel", "Intel Mac OS X 10.15", '"macOS"'),
+    ("Linux", "Linux x86_64", "Linux x86_64", '"Linux"'),
+)
+
+
+def _ua_platform(ua: str) -> tuple[str | None, str | None, str]:
+    for marker, platform, oscpu, ch_platform in _PLATFORMS:
+        if marker in ua:
+            return platform, oscpu, ch_platform
+    return None, None, '"Linux"'
+
+
+# Resolved once so neither Python nor the page has to re-scan UA strings
+UA_PLATFORMS = {ua: _ua_platform(ua) for ua in CHROME_USER_AGENTS + FIREFOX_USER_AGENTS}
+
+HW_CONCURRENCY = (4, 8, 12, 16)
+DEVICE_MEMORY = (4, 8, 16)
+
+# Dedicated generator so fingerprint sampling doesn't share the module-level
+# random state used elsewhere
+_rng = random.Random()
+_getrandbits = _rng.getrandbits
+
+
+def _take(bits: int, table: tuple):
+    """Pick from a small fixed table using the low digits of ``bits``.
+
+    Returns the entry and the unused high part, so one 64-bit draw can be
+    split across every fingerprint axis (mixed-radix decoding; the product
+    of all table sizes is far below 2**64, so the bias is negligible).
+    """
+    bits, index = divmod(bits, len(table))
+    return table[index], bits
+
+
+@dataclass(slots=True, frozen=True)
+class FingerprintSpec:
+    user_agent: str
+    platform: str | None
+    oscpu: str | None
+    ch_platform: str
+    viewport: dict
+    timezone: str
+    hw_concurrency: int
+    device_mem: int
+    webgl_vendor: str
+    webgl_renderer: str
+    color_depth: int
+
+
+def sample_fingerprint(firefox: bool = False) -> FingerprintSpec:
+    """Pick one value per independent fingerprint axis for a new session."""
+    bits = _getrandbits(64)
+    user_agent, bits = _take(bits, FIREFOX_USER_AGENTS if firefox else CHROME_USER_AGENTS)
+    (webgl_vendor, webgl_renderer), bits = _take(bits, WEBGL_RENDERERS)
+    viewport, bits = _take(bits, VIEWPORTS)
+    timezone, bits = _take(bits, TIMEZONES)
+    hw_concurrency, bits = _take(bits, HW_CONCURRENCY)
+    device_mem, bits = _take(bits, DEVICE_MEMORY)
+    color_depth, bits = _take(bits, COLOR_DEPTHS)
+    platform, oscpu, ch_platform = UA_PLATFORMS[user_agent]
+    return FingerprintSpec(
+        user_agent=user_agent,
+        platform=platform,
+        oscpu=oscpu,
+        ch_platform=ch_platform,
+        viewport=viewport,
+        timezone=timezone,
+        hw_concurrency=hw_concurrency,
+        device_mem=device_mem,
+        webgl_vendor=webgl_vendor,
+        webgl_renderer=webgl_renderer,
+        color_depth=color_depth,
+    )
+
+# ---------------------------------------------------------------------------
+# Fragments shared by the Chromium and Firefox scripts: canvas noise,
+# Permissions API, automation-property scrub and document visibility
+# ---------------------------------------------------------------------------
+
+_JS_CANVAS_NOISE = """
+(function() {
+    const seed = (Math.random() * 0x7fffffff) | 0 || 1;
+    let s = seed;
+    function nextRand() {
+        s = (s * 1664525 + 1013904223) & 0xFFFFFFFF;
+        return (s >>> 0) / 0xFFFFFFFF;
+    }
+
+    // Inject very subtle noise (±1 to a few of the first 25 pixels).
+    // Only the touched region is read back, and ImageData.data is a
+    // Uint8ClampedArray, so out-of-range writes saturate without clamping.
+    function addNoise(canvas) {
+        const ctx = canvas.getContext('2d');
+        if (!ctx || !canvas.width || !canvas.height) return;
+        const w = Math.min(canvas.width, 25);
+        const h = Math.min(canvas.height, Math.ceil(25 / w));
+        const imageData = ctx.getImageData(0, 0, w, h);
+        const pixels = imageData.data;
+        const n = Math.min(pixels.length, 100);
+        for (let i = 0; i < n; i += 4) {
+            if (nextRand() < 0.1) pixels[i] += nextRand() < 0.5 ? 1 : -1;
+        }
+        ctx.putImageData(imageData, 0, 0);
+    }
+
+    const origToDataURL = HTMLCanvasElement.prototype.toDataURL;
+    HTMLCanvasElement.prototype.toDataURL = function(type) {
+        addNoise(this);
+        return origToDataURL.apply(this, arguments);
+    };
+
+    const origToBlob = HTMLCanvasElement.prototype.toBlob;
+    HTMLCanvasElement.prototype.toBlob = function(callback, type, quality) {
+        try { addNoise(this); } catch(e) {}
+        return origToBlob.apply(this, arguments);
+    };
+})();
+"""
+
+_JS_PERMISSIONS = """
+(function() {
+    const origQuery = window.Permissions?.prototype?.query;
+    if (origQuery) {
+        window.Permissions.prototype.query = function(params) {
+            if (params?.name === 'notifications') {
+                return Promise.resolve({ state: 'default' });
+            }
+            return origQuery.call(this, params);
+        };
+    }
+})();
+"""
+
+_JS_AUTOMATION_SCRUB = """
+(function() {
+    const props = [
+        'domAutomation', 'domAutomationController',
+        '_selenium', '_Selenium_IDE_Recorder',
+        '__webdriver_script_fn', '__driver_evaluate',
+        '__webdriver_evaluate', '__fxdriver_evaluate',
+        '__driver_unwrapped', '__webdriver_unwrapped',
+        '__fxdriver_unwrapped', '__selenium_unwrapped',
+        '_WEBDRIVER_ELEM_CACHE', 'callSelenium',
+        'calledSelenium', '_phantom', '__nightmare',
+        'cdc_adoQpoasnfa76pfcZLmcfl_Array',
+        'cdc_adoQpoasnfa76pfcZLmcfl_Promise',
+        'cdc_adoQpoasnfa76pfcZLmcfl_Symbol',
+        'cdc_adoQpoasnfa76pfcZLmcfl_JSON',
+        'cdc_adoQpoasnfa76pfcZLmcfl_Object',
+    ];
+    // Single pass with one shared descriptor; only touch properties that are
+    // actually present, so absent ones don't become detectable own props
+    const hidden = { get: () => undefined, configurable: true };
+    for (const p of props) {
+        if (p in window) {
+            try {
+                delete window[p];
+                if (p in window) Object.defineProperty(window, p, hidden);
+            } catch(e) {}
+        }
+        // Also check document
+        if (p in document) {
+            try { delete document[p]; } catch(e) {}
+        }
+    }
+})();
+"""
+
+_JS_DOCUMENT_VISIBILITY = """
+Object.defineProperties(document, {
+    hidden: { get: () => false },
+    visibilityState: { get: () => 'visible' },
+});
+"""
 
 # ---------------------------------------------------------------------------
 # Chromium ULTRA-STEALTH script
@@ -78,53 +263,44 @@ COLOR_DEPTHS = [24, 24, 24, 30, 32]
 # ---------------------------------------------------------------------------
 
 
-def _build_chromium_stealth(webgl_vendor: str, webgl_renderer: str, color_depth: int, hw_concurrency: int, device_mem: int) -> str:
-    """Build a parameterized stealth script with unique fingerprint per session."""
-    return f"""
+_CHROMIUM_STEALTH_BODY = """
 // ============================================================
 // LEVEL 1: Core navigator patches
 // ============================================================
 
-// navigator.webdriver — the #1 detection vector
-Object.defineProperty(navigator, 'webdriver', {{ get: () => false }});
+// All navigator getters are installed in one defineProperties call
+const navigatorProps = {
+    // navigator.webdriver — the #1 detection vector
+    webdriver: { get: () => false },
+    languages: { get: () => ['en-US', 'en'] },
+    // Hardware fingerprint — consistent per session
+    hardwareConcurrency: { get: () => fp.hwConcurrency },
+    deviceMemory: { get: () => fp.deviceMemory },
+    maxTouchPoints: { get: () => 0 },
+};
+// navigator.platform consistency with UA (resolved from the UA in Python)
+if (fp.platform) navigatorProps.platform = { get: () => fp.platform };
+Object.defineProperties(navigator, navigatorProps);
 delete navigator.__proto__.webdriver;
 
-// navigator.languages
-Object.defineProperty(navigator, 'languages', {{ get: () => ['en-US', 'en'] }});
-
-// navigator.platform consistency with UA
-const ua = navigator.userAgent;
-if (ua.includes('Win')) {{
-    Object.defineProperty(navigator, 'platform', {{ get: () => 'Win32' }});
-}} else if (ua.includes('Mac')) {{
-    Object.defineProperty(navigator, 'platform', {{ get: () => 'MacIntel' }});
-}} else if (ua.includes('Linux')) {{
-    Object.defineProperty(navigator, 'platform', {{ get: () => 'Linux x86_64' }});
-}}
-
-// Hardware fingerprint — consistent per session
-Object.defineProperty(navigator, 'hardwareConcurrency', {{ get: () => {hw_concurrency} }});
-Object.defineProperty(navigator, 'deviceMemory', {{ get: () => {device_mem} }});
-Object.defineProperty(navigator, 'maxTouchPoints', {{ get: () => 0 }});
-
 // ============================================================
 // LEVEL 2: Chrome runtime (missing in headless = instant detection)
 // ============================================================
 
-window.chrome = {{
-    runtime: {{
-        PlatformOs: {{ MAC: 'mac', WIN: 'win', ANDROID: 'android', CROS: 'cros', LINUX: 'linux', OPENBSD: 'openbsd' }},
-        PlatformArch: {{ ARM: 'arm', X86_32: 'x86-32', X86_64: 'x86-64', MIPS: 'mips', MIPS64: 'mips64' }},
-        PlatformNaclArch: {{ ARM: 'arm', X86_32: 'x86-32', X86_64: 'x86-64', MIPS: 'mips', MIPS64: 'mips64' }},
-        RequestUpdateCheckStatus: {{ THROTTLED: 'throttled', NO_UPDATE: 'no_update', UPDATE_AVAILABLE: 'update_available' }},
-        OnInstalledReason: {{ INSTALL: 'install', UPDATE: 'update', CHROME_UPDATE: 'chrome_update', SHARED_MODULE_UPDATE: 'shared_module_update' }},
-        OnRestartRequiredReason: {{ APP_UPDATE: 'app_update', OS_UPDATE: 'os_update', PERIODIC: 'periodic' }},
-        connect: function() {{}},
-        sendMessage: function() {{}},
+window.chrome = {
+    runtime: {
+        PlatformOs: { MAC: 'mac', WIN: 'win', ANDROID: 'android', CROS: 'cros', LINUX: 'linux', OPENBSD: 'openbsd' },
+        PlatformArch: { ARM: 'arm', X86_32: 'x86-32', X86_64: 'x86-64', MIPS: 'mips', MIPS64: 'mips64' },
+        PlatformNaclArch: { ARM: 'arm', X86_32: 'x86-32', X86_64: 'x86-64', MIPS: 'mips', MIPS64: 'mips64' },
+        RequestUpdateCheckStatus: { THROTTLED: 'throttled', NO_UPDATE: 'no_update', UPDATE_AVAILABLE: 'update_available' },
+        OnInstalledReason: { INSTALL: 'install', UPDATE: 'update', CHROME_UPDATE: 'chrome_update', SHARED_MODULE_UPDATE: 'shared_module_update' },
+        OnRestartRequiredReason: { APP_UPDATE: 'app_update', OS_UPDATE: 'os_update', PERIODIC: 'periodic' },
+        connect: function() {},
+        sendMessage: function() {},
         id: undefined,
-    }},
-    loadTimes: function() {{
-        return {{
+    },
+    loadTimes: function() {
+        return {
             requestTime: Date.now() / 1000 - Math.random() * 3,
             startLoadTime: Date.now() / 1000 - Math.random() * 2,
             commitLoadTime: Date.now() / 1000 - Math.random(),
@@ -138,32 +314,32 @@ window.chrome = {{
             npnNegotiatedProtocol: 'h2',
             wasAlternateProtocolAvailable: false,
             connectionInfo: 'h2',
-        }};
-    }},
-    csi: function() {{
-        return {{
+        };
+    },
+    csi: function() {
+        return {
             onloadT: Date.now(),
             pageT: Math.random() * 3000 + 1000,
             startE: Date.now() - Math.random() * 5000,
             tran: 15,
-        }};
-    }},
-}};
+        };
+    },
+};
 
 // ============================================================
 // LEVEL 3: Plugins (headless has 0 plugins = detection)
 // ============================================================
 
-const makePlugin = (name, desc, filename) => {{
+const makePlugin = (name, desc, filename) => {
     const plugin = Object.create(Plugin.prototype);
-    Object.defineProperties(plugin, {{
-        name: {{ value: name, enumerable: true }},
-        description: {{ value: desc, enumerable: true }},
-        filename: {{ value: filename, enumerable: true }},
-        length: {{ value: 1, enumerable: true }},
-    }});
+    Object.defineProperties(plugin, {
+        name: { value: name, enumerable: true },
+        description: { value: desc, enumerable: true },
+        filename: { value: filename, enumerable: true },
+        length: { value: 1, enumerable: true },
+    });
     return plugin;
-}};
+};
 
 const plugins = [
     makePlugin('Chrome PDF Plugin', 'Portable Document Format', 'internal-pdf-viewer'),
@@ -171,42 +347,45 @@ const plugins = [
     makePlugin('Native Client', '', 'internal-nacl-plugin'),
 ];
 
-Object.defineProperty(navigator, 'plugins', {{
-    get: () => {{
+Object.defineProperty(navigator, 'plugins', {
+    get: () => {
         const arr = Object.create(PluginArray.prototype);
-        plugins.forEach((p, i) => {{ arr[i] = p; }});
-        Object.defineProperty(arr, 'length', {{ value: plugins.length }});
+        plugins.forEach((p, i) => { arr[i] = p; });
+        Object.defineProperty(arr, 'length', { value: plugins.length });
         arr.item = (i) => plugins[i];
         arr.namedItem = (name) => plugins.find(p => p.name === name);
-        arr.refresh = () => {{}};
+        arr.refresh = () => {};
         return arr;
-    }},
-}});
+    },
+});
 
 // ============================================================
 // LEVEL 4: WebGL fingerprint (unique per session)
 // ============================================================
 
-const glVendor = '{webgl_vendor}';
-const glRenderer = '{webgl_renderer}';
+const glVendor = fp.webglVendor;
+const glRenderer = fp.webglRenderer;
 
-const patchWebGL = (proto) => {{
+// UNMASKED_VENDOR_WEBGL / UNMASKED_RENDERER_WEBGL -> spoofed strings
+const glSpoof = Object.create(null);
+glSpoof[37445] = glVendor;
+glSpoof[37446] = glRenderer;
+const debugRendererInfo = Object.freeze({ UNMASKED_VENDOR_WEBGL: 37445, UNMASKED_RENDERER_WEBGL: 37446 });
+
+const patchWebGL = (proto) => {
     if (!proto) return;
     const orig = proto.getParameter;
-    proto.getParameter = function(param) {{
-        if (param === 37445) return glVendor;
-        if (param === 37446) return glRenderer;
-        return orig.call(this, param);
-    }};
+    proto.getParameter = function(param) {
+        const v = glSpoof[param];
+        return v !== undefined ? v : orig.call(this, param);
+    };
     // Also patch getExtension for WEBGL_debug_renderer_info
     const origExt = proto.getExtension;
-    proto.getExtension = function(name) {{
-        if (name === 'WEBGL_debug_renderer_info') {{
-            return {{ UNMASKED_VENDOR_WEBGL: 37445, UNMASKED_RENDERER_WEBGL: 37446 }};
-        }}
+    proto.getExtension = function(name) {
+        if (name === 'WEBGL_debug_renderer_info') return debugRendererInfo;
         return origExt.call(this, name);
-    }};
-}};
+    };
+};
 patchWebGL(WebGLRenderingContext.prototype);
 if (window.WebGL2RenderingContext) patchWebGL(WebGL2RenderingContext.prototype);
 
@@ -216,414 +395,410 @@ if (window.WebGL2RenderingContext) patchWebGL(WebGL2RenderingContext.prototype);
 // so each session produces a unique canvas fingerprint
 // ============================================================
 
-(function() {{
-    const seed = {random.randint(1, 2**31)};
-    let s = seed;
-    function nextRand() {{
-        s = (s * 1664525 + 1013904223) & 0xFFFFFFFF;
-        return (s >>> 0) / 0xFFFFFFFF;
-    }}
-
-    const origToDataURL = HTMLCanvasElement.prototype.toDataURL;
-    HTMLCanvasElement.prototype.toDataURL = function(type) {{
-        const ctx = this.getContext('2d');
-        if (ctx) {{
-            const imageData = ctx.getImageData(0, 0, this.width, this.height);
-            const pixels = imageData.data;
-            // Inject very subtle noise (±1 to a few random pixels)
-            for (let i = 0; i < Math.min(pixels.length, 100); i += 4) {{
-                if (nextRand() < 0.1) {{
-                    pixels[i] = Math.max(0, Math.min(255, pixels[i] + (nextRand() < 0.5 ? 1 : -1)));
-                }}
-            }}
-            ctx.putImageData(imageData, 0, 0);
-        }}
-        return origToDataURL.apply(this, arguments);
-    }};
-
-    const origToBlob = HTMLCanvasElement.prototype.toBlob;
-    HTMLCanvasElement.prototype.toBlob = function(callback, type, quality) {{
-        const ctx = this.getContext('2d');
-        if (ctx) {{
-            try {{
-                const imageData = ctx.getImageData(0, 0, this.width, this.height);
-                const pixels = imageData.data;
-                for (let i = 0; i < Math.min(pixels.length, 100); i += 4) {{
-                    if (nextRand() < 0.1) {{
-                        pixels[i] = Math.max(0, Math.min(255, pixels[i] + (nextRand() < 0.5 ? 1 : -1)));
-                    }}
-                }}
-                ctx.putImageData(imageData, 0, 0);
-            }} catch(e) {{}}
-        }}
-        return origToBlob.apply(this, arguments);
-    }};
-}})();
-
+""" + _JS_CANVAS_NOISE + """
 // ============================================================
 // LEVEL 6: AudioContext fingerprint spoofing
 // Each session produces a slightly different audio fingerprint
 // ============================================================
 
-(function() {{
-    const audioSeed = {random.randint(1, 2**31)};
-    if (window.OfflineAudioContext || window.webkitOfflineAudioContext) {{
+(function() {
+    const audioSeed = (Math.random() * 0x7fffffff) | 0;
+    if (window.OfflineAudioContext || window.webkitOfflineAudioContext) {
         const AudioCtx = window.OfflineAudioContext || window.webkitOfflineAudioContext;
         const origCreateOscillator = AudioCtx.prototype.createOscillator;
-        AudioCtx.prototype.createOscillator = function() {{
+        AudioCtx.prototype.createOscillator = function() {
             const osc = origCreateOscillator.call(this);
             const origConnect = osc.connect.bind(osc);
-            osc.connect = function(dest) {{
+            osc.connect = function(dest) {
                 const result = origConnect(dest);
                 // Add subtle gain variation
-                try {{
+                try {
                     const gain = osc.context.createGain();
                     gain.gain.value = 0.99 + (audioSeed % 100) / 10000;
                     origConnect(gain);
                     gain.connect(dest);
-                }} catch(e) {{}}
+                } catch(e) {}
                 return result;
-            }};
+            };
             return osc;
-        }};
-    }}
-}})();
+        };
+    }
+})();
 
 // ============================================================
 // LEVEL 7: WebRTC IP leak prevention
 // Blocks WebRTC from revealing real IP address
 // ============================================================
 
-(function() {{
+(function() {
     // Override RTCPeerConnection to prevent IP leaks
     const origRTC = window.RTCPeerConnection || window.webkitRTCPeerConnection || window.mozRTCPeerConnection;
-    if (origRTC) {{
-        const newRTC = function(config) {{
+    if (origRTC) {
+        const newRTC = function(config) {
             // Force relay-only ICE to prevent IP leak
-            if (config && config.iceServers) {{
+            if (config && config.iceServers) {
                 config.iceTransportPolicy = 'relay';
-            }}
+            }
             return new origRTC(config);
-        }};
+        };
         newRTC.prototype = origRTC.prototype;
         window.RTCPeerConnection = newRTC;
         if (window.webkitRTCPeerConnection) window.webkitRTCPeerConnection = newRTC;
-    }}
-}})();
+    }
+})();
 
 // ============================================================
 // LEVEL 8: Permissions API
 // ============================================================
 
-(function() {{
-    const origQuery = window.Permissions?.prototype?.query;
-    if (origQuery) {{
-        window.Permissions.prototype.query = function(params) {{
-            if (params?.name === 'notifications') {{
-                return Promise.resolve({{ state: 'default' }});
-            }}
-            return origQuery.call(this, params);
-        }};
-    }}
-}})();
-
+""" + _JS_PERMISSIONS + """
 // ============================================================
 // LEVEL 9: Screen & display consistency
 // ============================================================
 
-(function() {{
+(function() {
     const w = window.outerWidth || screen.width || 1920;
     const h = window.outerHeight || screen.height || 1080;
-    try {{
-        Object.defineProperty(screen, 'availWidth', {{ get: () => w }});
-        Object.defineProperty(screen, 'availHeight', {{ get: () => h - 40 }});
-        Object.defineProperty(screen, 'width', {{ get: () => w }});
-        Object.defineProperty(screen, 'height', {{ get: () => h }});
-        Object.defineProperty(screen, 'colorDepth', {{ get: () => {color_depth} }});
-        Object.defineProperty(screen, 'pixelDepth', {{ get: () => {color_depth} }});
-        Object.defineProperty(screen, 'availLeft', {{ get: () => 0 }});
-        Object.defineProperty(screen, 'availTop', {{ get: () => 0 }});
-    }} catch(e) {{}}
+    try {
+        Object.defineProperties(screen, {
+            availWidth: { get: () => w },
+            availHeight: { get: () => h - 40 },
+            width: { get: () => w },
+            height: { get: () => h },
+            colorDepth: { get: () => fp.colorDepth },
+            pixelDepth: { get: () => fp.colorDepth },
+            availLeft: { get: () => 0 },
+            availTop: { get: () => 0 },
+        });
+    } catch(e) {}
     // window.devicePixelRatio
-    Object.defineProperty(window, 'devicePixelRatio', {{ get: () => 1 }});
-}})();
+    Object.defineProperty(window, 'devicePixelRatio', { get: () => 1 });
+})();
 
 // ============================================================
 // LEVEL 10: Connection type spoofing
 // ============================================================
 
-if (navigator.connection) {{
-    try {{
-        Object.defineProperty(navigator.connection, 'rtt', {{ get: () => {random.choice([50, 75, 100, 150])} }});
-        Object.defineProperty(navigator.connection, 'downlink', {{ get: () => {random.choice([10, 15, 20, 50])} }});
-        Object.defineProperty(navigator.connection, 'effectiveType', {{ get: () => '4g' }});
-        Object.defineProperty(navigator.connection, 'saveData', {{ get: () => false }});
-    }} catch(e) {{}}
-}}
+if (navigator.connection) {
+    const rtt = [50, 75, 100, 150][Math.floor(Math.random() * 4)];
+    const downlink = [10, 15, 20, 50][Math.floor(Math.random() * 4)];
+    try {
+        Object.defineProperties(navigator.connection, {
+            rtt: { get: () => rtt },
+            downlink: { get: () => downlink },
+            effectiveType: { get: () => '4g' },
+            saveData: { get: () => false },
+        });
+    } catch(e) {}
+}
 
 // ============================================================
 // LEVEL 11: Notification.permission
 // ============================================================
 
-try {{
-    Object.defineProperty(Notification, 'permission', {{ get: () => 'default' }});
-}} catch(e) {{}}
+try {
+    Object.defineProperty(Notification, 'permission', { get: () => 'default' });
+} catch(e) {}
 
 // ============================================================
 // LEVEL 12: Hide ALL automation properties
 // ============================================================
 
-(function() {{
-    const props = [
-        'domAutomation', 'domAutomationController',
-        '_selenium', '_Selenium_IDE_Recorder',
-        '__webdriver_script_fn', '__driver_evaluate',
-        '__webdriver_evaluate', '__fxdriver_evaluate',
-        '__driver_unwrapped', '__webdriver_unwrapped',
-        '__fxdriver_unwrapped', '__selenium_unwrapped',
-        '_WEBDRIVER_ELEM_CACHE', 'callSelenium',
-        'calledSelenium', '_phantom', '__nightmare',
-        'cdc_adoQpoasnfa76pfcZLmcfl_Array',
-        'cdc_adoQpoasnfa76pfcZLmcfl_Promise',
-        'cdc_adoQpoasnfa76pfcZLmcfl_Symbol',
-        'cdc_adoQpoasnfa76pfcZLmcfl_JSON',
-        'cdc_adoQpoasnfa76pfcZLmcfl_Object',
-    ];
-    props.forEach(p => {{
-        try {{ delete window[p]; }} catch(e) {{}}
-        try {{ Object.defineProperty(window, p, {{ get: () => undefined }}); }} catch(e) {{}}
-    }});
-    // Also check document
-    props.forEach(p => {{
-        try {{ delete document[p]; }} catch(e) {{}}
-    }});
-}})();
-
+""" + _JS_AUTOMATION_SCRUB + """
 // ============================================================
 // LEVEL 13: CDP (Chrome DevTools Protocol) detection prevention
 // Sites detect CDP by checking for Runtime.enable side effects
 // ============================================================
 
-(function() {{
+(function() {
     // Prevent Error.stack from revealing CDP
     const origPrepare = Error.prepareStackTrace;
-    if (origPrepare) {{
-        Error.prepareStackTrace = function(err, stack) {{
+    if (origPrepare) {
+        Error.prepareStackTrace = function(err, stack) {
             // Filter out CDP-related frames
-            const filtered = stack.filter(frame => {{
+            const filtered = stack.filter(frame => {
                 const fn = frame.getFunctionName() || '';
                 const file = frame.getFileName() || '';
                 return !fn.includes('Runtime') && !file.includes('pptr') && !file.includes('playwright');
-            }});
+            });
             return origPrepare(err, filtered);
-        }};
-    }}
-}})();
+        };
+    }
+})();
 
 // ============================================================
 // LEVEL 14: Media codecs (headless may differ)
 // ============================================================
 
-if (window.MediaSource) {{
+if (window.MediaSource) {
     const origIsTypeSupported = MediaSource.isTypeSupported;
-    MediaSource.isTypeSupported = function(type) {{
+    MediaSource.isTypeSupported = function(type) {
         if (type.includes('video/mp4')) return true;
         if (type.includes('video/webm')) return true;
         if (type.includes('audio/mp4')) return true;
         if (type.includes('audio/webm')) return true;
         return origIsTypeSupported.call(this, type);
-    }};
-}}
+    };
+}
 
 // ============================================================
 // LEVEL 15: iframe contentWindow protection
 // ============================================================
 
-try {{
+try {
     const elementDescriptor = Object.getOwnPropertyDescriptor(HTMLElement.prototype, 'offsetHeight');
-    if (elementDescriptor) {{
-        Object.defineProperty(HTMLDivElement.prototype, 'offsetHeight', {{
+    if (elementDescriptor) {
+        Object.defineProperty(HTMLDivElement.prototype, 'offsetHeight', {
             ...elementDescriptor,
-            get: function() {{
+            get: function() {
                 if (this.id === 'modernizr') return 1;
                 return elementDescriptor.get.call(this);
-            }},
-        }});
-    }}
-}} catch(e) {{}}
+            },
+        });
+    }
+} catch(e) {}
 
 // ============================================================
 // LEVEL 16: Battery API spoofing
 // ============================================================
 
-if (navigator.getBattery) {{
-    navigator.getBattery = function() {{
-        return Promise.resolve({{
+if (navigator.getBattery) {
+    const batteryLevel = Math.round((Math.random() * 0.5 + 0.5) * 100) / 100;
+    navigator.getBattery = function() {
+        return Promise.resolve({
             charging: true,
             chargingTime: 0,
             dischargingTime: Infinity,
-            level: {round(random.uniform(0.5, 1.0), 2)},
-            addEventListener: function() {{}},
-            removeEventListener: function() {{}},
-        }});
-    }};
-}}
+            level: batteryLevel,
+            addEventListener: function() {},
+            removeEventListener: function() {},
+        });
+    };
+}
 
 // ============================================================
 // LEVEL 17: Speech synthesis voices (Chrome has these)
 // ============================================================
 
-if (window.speechSynthesis) {{
+if (window.speechSynthesis) {
     const origGetVoices = speechSynthesis.getVoices;
-    speechSynthesis.getVoices = function() {{
+    speechSynthesis.getVoices = function() {
         const voices = origGetVoices.call(this);
-        if (voices.length === 0) {{
+        if (voices.length === 0) {
             return [
-                {{ default: true, lang: 'en-US', localService: true, name: 'Google US English', voiceURI: 'Google US English' }},
-                {{ default: false, lang: 'en-GB', localService: true, name: 'Google UK English Female', voiceURI: 'Google UK English Female' }},
-                {{ default: false, lang: 'en-US', localService: true, name: 'Google US English Male', voiceURI: 'Google US English Male' }},
+                { default: true, lang: 'en-US', localService: true, name: 'Google US English', voiceURI: 'Google US English' },
+                { default: false, lang: 'en-GB', localService: true, name: 'Google UK English Female', voiceURI: 'Google UK English Female' },
+                { default: false, lang: 'en-US', localService: true, name: 'Google US English Male', voiceURI: 'Google US English Male' },
             ];
-        }}
+        }
         return voices;
-    }};
-}}
-
-// ============================================================
-// LEVEL 18: Keyboard & Input event consistency
-// Make synthetic events indistinguishable from real ones
-// ============================================================
-
-(function() {{
-    const origAddEvent = EventTarget.prototype.addEventListener;
-    EventTarget.prototype.addEventListener = function(type, fn, options) {{
-        if (type === 'keydown' || type === 'keyup' || type === 'keypress') {{
-            const wrappedFn = function(e) {{
-                // Ensure isTrusted looks real
-                if (!e.isTrusted) {{
-                    const fakeEvent = new KeyboardEvent(e.type, {{
-                        key: e.key,
-                        code: e.code,
-                        keyCode: e.keyCode,
-                        which: e.which,
-                        bubbles: true,
-                        cancelable: true,
-                    }});
-                    Object.defineProperty(fakeEvent, 'isTrusted', {{ get: () => true }});
-                    return fn.call(this, fakeEvent);
-                }}
-                return fn.call(this, e);
-            }};
-            return origAddEvent.call(this, type, wrappedFn, options);
-        }}
-        return origAddEvent.call(this, type, fn, options);
-    }};
-}})();
+    };
+}
 
 // ============================================================
-// LEVEL 19: Document properties
+// LEVEL 18: Document properties
 // ============================================================
 
-Object.defineProperty(document, 'hidden', {{ get: () => false }});
-Object.defineProperty(document, 'visibilityState', {{ get: () => 'visible' }});
-
+""" + _JS_DOCUMENT_VISIBILITY + """
 // ============================================================
-// LEVEL 20: Performance.now() noise
+// LEVEL 19: Performance.now() noise
 // Prevent timing-based fingerprinting
 // ============================================================
 
-(function() {{
+(function() {
     const origNow = Performance.prototype.now;
-    Performance.prototype.now = function() {{
+    Performance.prototype.now = function() {
         return origNow.call(this) + Math.random() * 0.1;
-    }};
-}})();
+    };
+})();
 """
 
-
-def _build_firefox_stealth(hw_concurrency: int) -> str:
-    """Build Firefox-specific stealth script."""
-    return f"""
+_FIREFOX_STEALTH_BODY = """
 // Firefox stealth — lighter, targets Firefox-specific detection vectors
 
-Object.defineProperty(navigator, 'webdriver', {{ get: () => false }});
-Object.defineProperty(navigator, 'languages', {{ get: () => ['en-US', 'en'] }});
-
-const ua = navigator.userAgent;
-if (ua.includes('Win')) {{
-    Object.defineProperty(navigator, 'platform', {{ get: () => 'Win32' }});
-    Object.defineProperty(navigator, 'oscpu', {{ get: () => 'Windows NT 10.0; Win64; x64' }});
-}} else if (ua.includes('Mac')) {{
-    Object.defineProperty(navigator, 'platform', {{ get: () => 'MacIntel' }});
-    Object.defineProperty(navigator, 'oscpu', {{ get: () => 'Intel Mac OS X 10.15' }});
-}} else if (ua.includes('Linux')) {{
-    Object.defineProperty(navigator, 'platform', {{ get: () => 'Linux x86_64' }});
-    Object.defineProperty(navigator, 'oscpu', {{ get: () => 'Linux x86_64' }});
-}}
-
-Object.defineProperty(navigator, 'hardwareConcurrency', {{ get: () => {hw_concurrency} }});
-Object.defineProperty(navigator, 'maxTouchPoints', {{ get: () => 0 }});
+const navigatorProps = {
+    webdriver: { get: () => false },
+    languages: { get: () => ['en-US', 'en'] },
+    hardwareConcurrency: { get: () => fp.hwConcurrency },
+    maxTouchPoints: { get: () => 0 },
+};
+if (fp.platform) {
+    navigatorProps.platform = { get: () => fp.platform };
+    navigatorProps.oscpu = { get: () => fp.oscpu };
+}
+Object.defineProperties(navigator, navigatorProps);
 
 // Screen
-try {{
+try {
     const w = window.innerWidth || 1920;
     const h = window.innerHeight || 1080;
-    Object.defineProperty(screen, 'availWidth', {{ get: () => w }});
-    Object.defineProperty(screen, 'availHeight', {{ get: () => h - 40 }});
-}} catch(e) {{}}
+    Object.defineProperties(screen, {
+        availWidth: { get: () => w },
+        availHeight: { get: () => h - 40 },
+    });
+} catch(e) {}
 
 // WebRTC IP leak prevention
-(function() {{
+(function() {
     const origRTC = window.RTCPeerConnection || window.mozRTCPeerConnection;
-    if (origRTC) {{
-        const newRTC = function(config) {{
+    if (origRTC) {
+        const newRTC = function(config) {
             if (config && config.iceServers) config.iceTransportPolicy = 'relay';
             return new origRTC(config);
-        }};
+        };
         newRTC.prototype = origRTC.prototype;
         window.RTCPeerConnection = newRTC;
-    }}
-}})();
+    }
+})();
+""" + _JS_CANVAS_NOISE + _JS_AUTOMATION_SCRUB + _JS_PERMISSIONS + _JS_DOCUMENT_VISIBILITY
 
-// Canvas noise
-(function() {{
-    const seed = {random.randint(1, 2**31)};
-    let s = seed;
-    function nextRand() {{ s = (s * 1664525 + 1013904223) & 0xFFFFFFFF; return (s >>> 0) / 0xFFFFFFFF; }}
-    const origToDataURL = HTMLCanvasElement.prototype.toDataURL;
-    HTMLCanvasElement.prototype.toDataURL = function() {{
-        try {{
-            const ctx = this.getContext('2d');
-            if (ctx) {{
-                const d = ctx.getImageData(0, 0, this.width, this.height);
-                for (let i = 0; i < Math.min(d.data.length, 80); i += 4) {{
-                    if (nextRand() < 0.1) d.data[i] = Math.max(0, Math.min(255, d.data[i] + (nextRand() < 0.5 ? 1 : -1)));
-                }}
-                ctx.putImageData(d, 0, 0);
-            }}
-        }} catch(e) {{}}
-        return origToDataURL.apply(this, arguments);
-    }};
-}})();
-
-// Hide automation
-['domAutomation','domAutomationController','_selenium','__webdriver_script_fn',
- '__driver_evaluate','__webdriver_evaluate','__fxdriver_evaluate','_phantom','__nightmare'
-].forEach(p => {{ try {{ delete window[p]; }} catch(e) {{}} }});
-
-// Permissions
-try {{
-    const oq = window.Permissions?.prototype?.query;
-    if (oq) {{
-        window.Permissions.prototype.query = function(p) {{
-            if (p?.name === 'notifications') return Promise.resolve({{ state: 'default' }});
-            return oq.call(this, p);
-        }};
-    }}
-}} catch(e) {{}}
-
-Object.defineProperty(document, 'hidden', {{ get: () => false }});
-Object.defineProperty(document, 'visibilityState', {{ get: () => 'visible' }});
-"""
+
+def _minify_js(src: str) -> str:
+    """Drop ``//`` comments, indentation and blank lines from a script.
+
+    Line breaks are kept so automatic semicolon insertion still applies, and
+    quoted strings are copied verbatim so a ``//`` inside one is left alone.
+    The stealth bodies use no regex or template literals.
+    """
+    lines = []
+    for line in src.splitlines():
+        quote = None
+        end = len(line)
+        i = 0
+        while i < len(line):
+            ch = line[i]
+            if quote:
+                if ch == "\\":
+                    i += 1
+                elif ch == quote:
+                    quote = None
+            elif ch in "'\"":
+                quote = ch
+            elif line.startswith("//", i):
+                end = i
+                break
+            i += 1
+        line = line[:end].strip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+# The static bodies are minified and wrapped once at import as the head of an
+# IIFE; a session's script is that head plus the small JSON argument carrying
+# its pinned fingerprint values. The wrapper also keeps the bodies' helpers out of
+# the page's global scope.
+_CHROMIUM_STEALTH_HEAD = "(function(fp) {" + _minify_js(_CHROMIUM_STEALTH_BODY) + "})("
+_FIREFOX_STEALTH_HEAD = "(function(fp) {" + _minify_js(_FIREFOX_STEALTH_BODY) + "})("
+_STEALTH_TAIL = ");\n"
+
+
+@lru_cache(maxsize=1024)
+def _build_chromium_stealth(platform: str | None, webgl_vendor: str, webgl_renderer: str, color_depth: int, hw_concurrency: int, device_mem: int) -> str:
+    """Build a parameterized stealth script with unique fingerprint per session."""
+    fingerprint = orjson.dumps({
+        "platform": platform,
+        "hwConcurrency": hw_concurrency,
+        "deviceMemory": device_mem,
+        "webglVendor": webgl_vendor,
+        "webglRenderer": webgl_renderer,
+        "colorDepth": color_depth,
+    }).decode()
+    return _CHROMIUM_STEALTH_HEAD + fingerprint + _STEALTH_TAIL
+
+
+@lru_cache(maxsize=64)
+def _build_firefox_stealth(platform: str | None, oscpu: str | None, hw_concurrency: int) -> str:
+    """Build Firefox-specific stealth script."""
+    fingerprint = orjson.dumps({
+        "platform": platform,
+        "oscpu": oscpu,
+        "hwConcurrency": hw_concurrency,
+    }).decode()
+    return _FIREFOX_STEALTH_HEAD + fingerprint + _STEALTH_TAIL
+
+
+# Context options and request headers shared by every context; only the
+# Chromium Sec-Ch-Ua-Platform header varies, so one dict is prebuilt per
+# platform. Read-only views, since every context shares the same objects.
+_CONTEXT_KWARGS = MappingProxyType(dict(
+    locale="en-US",
+    ignore_https_errors=True,
+    java_script_enabled=True,
+    has_touch=False,
+    is_mobile=False,
+    color_scheme="light",
+))
+
+_FIREFOX_HTTP_HEADERS = MappingProxyType({
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate, br",
+    "DNT": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+})
+
+_CHROMIUM_HTTP_HEADERS = {
+    ch_platform: MappingProxyType({
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Sec-Ch-Ua": '"Chromium";v="125", "Google Chrome";v="125", "Not-A.Brand";v="99"',
+        "Sec-Ch-Ua-Mobile": "?0",
+        "Sec-Ch-Ua-Platform": ch_platform,
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-User": "?1",
+        "Upgrade-Insecure-Requests": "1",
+    })
+    for ch_platform in {ch for _, _, ch in UA_PLATFORMS.values()}
+}
+
+
+# Sets each field's value through the prototype's native setter (so
+# framework-controlled inputs, whose own setter may be overridden, see the
+# change) and fires input/change like page.fill. Stops at the first field
+# page.fill should handle instead and returns how many were filled, so
+# fields are always filled in order
+_FILL_FIELDS_JS = """(fields) => {
+    const textTypes = new Set(['text', 'password', 'email', 'search', 'tel', 'url']);
+    let filled = 0;
+    for (const {selector, text} of fields) {
+        let el;
+        try { el = document.querySelector(selector); } catch (e) { break; }
+        let proto;
+        if (el instanceof HTMLTextAreaElement) proto = HTMLTextAreaElement.prototype;
+        else if (el instanceof HTMLInputElement && textTypes.has(el.type)) proto = HTMLInputElement.prototype;
+        else break;
+        if (el.disabled || el.readOnly) break;
+        if (!el.getClientRects().length || getComputedStyle(el).visibility !== 'visible') break;
+        const setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+        el.focus();
+        setter.call(el, text);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        filled++;
+    }
+    return filled;
+}"""
+
+
+# Domains kept in the cookie jar before the least recently used is dropped
+_COOKIE_JAR_MAX_DOMAINS = 256
+
+
+@lru_cache(maxsize=4096)
+def _url_domain(url: str) -> str:
+    """Lowercased netloc of a URL; cookie save and restore look up the same URL."""
+    try:
+        return urlparse(url).netloc.lower()
+    except Exception:
+        return ""
 
 
 class BrowserPool:
@@ -631,18 +806,43 @@ class BrowserPool:
 
     Chromium is the default. Firefox is used as fallback for hard-to-scrape
     sites because bot detection scripts primarily target Chrome/Chromium.
-    Each page gets a unique fingerprint (WebGL, canvas seed, hardware, etc.).
+    Each context gets its own fingerprint (WebGL, hardware, etc.). Inside
+    Celery workers, proxy-less pages without actions share a small pool of
+    such contexts; everything else gets a fresh one.
+    Each browser has its own BROWSER_POOL_SIZE page slots, and callers that
+    don't need a specific engine go to whichever has fewer pages in flight.
     """
 
     def __init__(self):
         self._playwright = None
         self._chromium: Browser | None = None
         self._firefox: Browser | None = None
-        self._semaphore: asyncio.Semaphore | None = None
+        # Per-browser page slots, and pages holding or waiting for one
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._load: dict[str, int] = {}
         self._initialized = False
         self._loop = None
-        # Cookie jar: domain -> list of cookies (persisted across page contexts)
-        self._cookie_jar: dict[str, list[dict]] = {}
+        # Cookie jar: domain -> {(name, domain, path): cookie}, least recently used first
+        self._cookie_jar: OrderedDict[str, dict[tuple[str, str, str], dict]] = OrderedDict()
+        # Jar version per domain (bumped on change), and the version each live
+        # context was last synced to, so restores into pooled contexts are skipped
+        self._cookie_versions: dict[str, int] = {}
+        self._cookie_seq = 0
+        self._synced_cookies: weakref.WeakKeyDictionary[BrowserContext, dict[str, int]] = weakref.WeakKeyDictionary()
+        # Reusable contexts keyed by (firefox, stealth, slot), each with its own fingerprint
+        self._contexts: dict[tuple[bool, bool, int], BrowserContext] = {}
+        # Per pooled context: pages served so far, and pages currently open.
+        # Past BROWSER_CONTEXT_MAX_PAGES a context leaves the pool and is
+        # closed with its last page, so cookies, storage and cache gathered
+        # from earlier jobs don't accumulate for the life of the process
+        self._context_uses: weakref.WeakKeyDictionary[BrowserContext, int] = weakref.WeakKeyDictionary()
+        self._context_open: weakref.WeakKeyDictionary[BrowserContext, int] = weakref.WeakKeyDictionary()
+        self._context_lock: asyncio.Lock | None = None
+        # Set by worker processes. The API process scrapes inline for many
+        # users at once, so it never shares contexts between pages
+        self.share_contexts = False
+        # Playwright driver pid captured at launch, for cleanup after a loop change
+        self._driver_pid: int | None = None
 
     async def initialize(self):
         current_loop = asyncio.get_running_loop()
@@ -656,11 +856,15 @@ class BrowserPool:
             self._playwright = None
             self._chromium = None
             self._firefox = None
+            self._contexts.clear()
+            self._context_uses.clear()
+            self._context_open.clear()
             self._initialized = False
 
         self._loop = current_loop
-        self._semaphore = asyncio.Semaphore(settings.BROWSER_POOL_SIZE)
+        self._context_lock = asyncio.Lock()
         self._playwright = await async_playwright().start()
+        self._driver_pid = self._get_driver_pid(self._playwright)
 
         # Chromium with anti-detection flags
         self._chromium = await self._playwright.chromium.launch(
@@ -683,10 +887,8 @@ class BrowserPool:
                 "--disable-background-networking",
                 "--disable-sync",
                 "--metrics-recording-only",
-                "--disable-features=IsolateOrigins,site-per-process,TranslateUI",
+                "--disable-features=TranslateUI",
                 "--enable-features=NetworkService,NetworkServiceInProcess",
-                "--disable-web-security",
-                "--allow-running-insecure-content",
             ],
         )
 
@@ -698,32 +900,35 @@ class BrowserPool:
             logger.warning(f"Firefox launch failed (Chromium only): {e}")
             self._firefox = None
 
+        engines = ("chromium", "firefox") if self._firefox else ("chromium",)
+        self._semaphores = {name: asyncio.Semaphore(settings.BROWSER_POOL_SIZE) for name in engines}
+        self._load = dict.fromkeys(engines, 0)
+
         self._initialized = True
         logger.info(f"Browser pool initialized (pool_size={settings.BROWSER_POOL_SIZE})")
 
+    @staticmethod
+    def _get_driver_pid(playwright) -> int | None:
+        """Read the driver process id; Playwright only exposes it via internals."""
+        try:
+            return playwright._impl_obj._connection._transport._proc.pid
+        except Exception:
+            return None
+
     def _force_kill_old_browsers(self):
-        """Synchronously kill old browser processes tied to a dead event loop."""
+        """Synchronously kill old browser processes tied to a dead event loop.
+
+        Browsers are launched by the Playwright driver over a pipe and exit
+        when it closes, so killing the driver takes them down with it.
+        """
         import os
         import signal
-        for browser in [self._chromium, self._firefox]:
+        if self._driver_pid:
             try:
-                if browser and hasattr(browser, '_impl_obj'):
-                    proc = getattr(browser._impl_obj, '_browser_process', None)
-                    if proc and proc.pid:
-                        os.kill(proc.pid, signal.SIGKILL)
+                os.kill(self._driver_pid, signal.SIGKILL)
             except Exception:
                 pass
-        try:
-            if self._playwright and hasattr(self._playwright, '_impl_obj'):
-                conn = getattr(self._playwright._impl_obj, '_connection', None)
-                if conn:
-                    transport = getattr(conn, '_transport', None)
-                    if transport:
-                        proc = getattr(transport, '_proc', None)
-                        if proc:
-                            proc.kill()
-        except Exception:
-            pass
+        self._driver_pid = None
 
     async def shutdown(self):
         if self._firefox:
@@ -732,159 +937,252 @@ class BrowserPool:
             await self._chromium.close()
         if self._playwright:
             await self._playwright.stop()
+        self._contexts.clear()
+        self._context_uses.clear()
+        self._context_open.clear()
         self._initialized = False
         self._loop = None
         logger.info("Browser pool shut down")
 
     def _get_domain(self, url: str) -> str:
         """Extract domain from URL for cookie jar."""
-        try:
-            from urllib.parse import urlparse
-            return urlparse(url).netloc.lower()
-        except Exception:
-            return ""
+        return _url_domain(url)
 
     async def _restore_cookies(self, context: BrowserContext, url: str):
         """Restore saved cookies for this domain."""
         domain = self._get_domain(url)
-        if domain in self._cookie_jar:
-            try:
-                await context.add_cookies(self._cookie_jar[domain])
-            except Exception:
-                pass
+        jar = self._cookie_jar.get(domain)
+        if not jar:
+            return
+        self._cookie_jar.move_to_end(domain)
+
+        # A pooled context that already holds this jar version needs no round trip
+        version = self._cookie_versions[domain]
+        synced = self._synced_cookies.setdefault(context, {})
+        if synced.get(domain) == version:
+            return
+        try:
+            await context.add_cookies(list(jar.values()))
+            synced[domain] = version
+        except Exception:
+            pass
 
     async def _save_cookies(self, context: BrowserContext, url: str):
         """Save cookies from this session for future reuse."""
         domain = self._get_domain(url)
         try:
-            cookies = await context.cookies()
-            if cookies:
-                self._cookie_jar[domain] = cookies
+            # Scoped to the URL: pooled contexts carry cookies for many sites
+            cookies = await context.cookies(url)
         except Exception:
-            pass
+            return
+
+        # Rebuilt from the context rather than merged, so cookies the site
+        # deleted or let expire are not restored into later contexts
+        now = time.time()
+        fresh = {
+            (c["name"], c.get("domain", ""), c.get("path", "/")): c
+            for c in cookies
+            if not 0 < c.get("expires", -1) < now
+        }
+        if not fresh:
+            if self._cookie_jar.pop(domain, None) is not None:
+                self._cookie_versions.pop(domain, None)
+            return
+
+        jar = self._cookie_jar.get(domain)
+        if jar is None:
+            if len(self._cookie_jar) >= _COOKIE_JAR_MAX_DOMAINS:
+                evicted, _ = self._cookie_jar.popitem(last=False)
+                self._cookie_versions.pop(evicted, None)
+        else:
+            self._cookie_jar.move_to_end(domain)
+        self._cookie_jar[domain] = fresh
+
+        if fresh != jar:
+            self._cookie_seq += 1
+            self._cookie_versions[domain] = self._cookie_seq
+        # The jar is now exactly what this context holds for the URL
+        self._synced_cookies.setdefault(context, {})[domain] = self._cookie_versions[domain]
+
+    async def new_context(
+        self,
+        browser: Browser,
+        fp: FingerprintSpec,
+        proxy: dict | None = None,
+        stealth: bool = True,
+        firefox: bool = False,
+    ) -> BrowserContext:
+        """Create a context for one fingerprint, with stealth installed once.
+
+        The stealth script is registered on the context, so every page opened
+        from it inherits the patches without another injection.
+        """
+        if firefox:
+            headers = _FIREFOX_HTTP_HEADERS
+        else:
+            headers = _CHROMIUM_HTTP_HEADERS[fp.ch_platform]
+        context_kwargs = dict(
+            _CONTEXT_KWARGS,
+            user_agent=fp.user_agent,
+            viewport=fp.viewport,
+            timezone_id=fp.timezone,
+            extra_http_headers=headers,
+        )
+
+        if proxy:
+            context_kwargs["proxy"] = proxy
+
+        context: BrowserContext = await browser.new_context(**context_kwargs)
+
+        if stealth:
+            if firefox:
+                script = _build_firefox_stealth(fp.platform, fp.oscpu, fp.hw_concurrency)
+            else:
+                script = _build_chromium_stealth(
+                    fp.platform, fp.webgl_vendor, fp.webgl_renderer, fp.color_depth,
+                    fp.hw_concurrency, fp.device_mem,
+                )
+            # Passed inline on purpose: the Python client reads path= files
+            # itself and sends the same source over the pipe, so a file would
+            # only add disk I/O per context
+            await context.add_init_script(script)
+
+        return context
+
+    async def acquire_context(self, browser: Browser, stealth: bool, firefox: bool) -> BrowserContext:
+        """Return a pooled context from a random fingerprint slot, creating it on first use.
+
+        Pages opened in a pooled context reuse its network stack and the init
+        script installed at creation, instead of paying for a new context.
+        Every call must be paired with release_context().
+        """
+        key = (firefox, stealth, _rng.randrange(settings.BROWSER_CONTEXT_POOL_SIZE))
+        context = self._contexts.get(key)
+        if context is None:
+            async with self._context_lock:
+                context = self._contexts.get(key)
+                if context is None:
+                    fp = sample_fingerprint(firefox=firefox)
+                    context = await self.new_context(browser, fp, stealth=stealth, firefox=firefox)
+                    context.on("close", lambda ctx: self._forget_context(key, ctx))
+                    self._contexts[key] = context
+
+        uses = self._context_uses.get(context, 0) + 1
+        self._context_uses[context] = uses
+        self._context_open[context] = self._context_open.get(context, 0) + 1
+        if self._context_retired(context):
+            # Later pages get a fresh context in this slot; this one is
+            # closed by release_context() once its open pages are done
+            self._forget_context(key, context)
+        return context
+
+    async def release_context(self, context: BrowserContext):
+        """Return a page's slot in a pooled context, closing it if retired and idle."""
+        open_pages = self._context_open.get(context, 1) - 1
+        self._context_open[context] = open_pages
+        if open_pages <= 0 and self._context_retired(context):
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"Closing retired browser context failed: {e}")
+
+    def _context_retired(self, context: BrowserContext) -> bool:
+        limit = settings.BROWSER_CONTEXT_MAX_PAGES
+        return limit > 0 and self._context_uses.get(context, 0) >= limit
+
+    def _forget_context(self, key: tuple[bool, bool, int], context: BrowserContext):
+        """Drop a pooled context once Playwright reports it closed."""
+        if self._contexts.get(key) is context:
+            del self._contexts[key]
 
     @asynccontextmanager
     async def get_page(
         self,
         proxy: dict | None = None,
         stealth: bool = True,
-        use_firefox: bool = False,
+        use_firefox: bool | None = False,
         target_url: str | None = None,
+        isolated: bool = False,
     ):
-        """Get a browser page with unique fingerprint and full stealth.
+        """Get a browser page with a sampled fingerprint and full stealth.
+
+        The page may come from a pooled context shared with other pages, so
+        its fingerprint, storage and cache are not unique to this call.
 
         Args:
             proxy: Optional proxy dict for Playwright
             stealth: Whether to apply stealth patches
-            use_firefox: Use Firefox instead of Chromium
+            use_firefox: Use Firefox instead of Chromium; None picks the
+                less loaded of the two
             target_url: Target URL (used for cookie restoration)
+            isolated: Always use a fresh context, e.g. for pages that run
+                actions such as logins whose session must not outlive them
         """
         await self.initialize()
 
         from app.core.metrics import active_browser_contexts
 
-        is_firefox = use_firefox and self._firefox is not None
+        if use_firefox is None:
+            engine = min(self._load, key=self._load.get)
+        else:
+            engine = "firefox" if use_firefox and self._firefox is not None else "chromium"
+        is_firefox = engine == "firefox"
         browser = self._firefox if is_firefox else self._chromium
+        # Keep this dict: a reinit swaps in fresh counters mid-page
+        load = self._load
 
-        async with self._semaphore:
-            active_browser_contexts.inc()
-            try:
-                vp = random.choice(VIEWPORTS)
-                tz = random.choice(TIMEZONES)
-
-                # Generate unique session fingerprint
-                hw_concurrency = random.choice([4, 8, 12, 16])
-                device_mem = random.choice([4, 8, 16])
-                webgl_vendor, webgl_renderer = random.choice(WEBGL_RENDERERS)
-                color_depth = random.choice(COLOR_DEPTHS)
-
-                if is_firefox:
-                    ua = random.choice(FIREFOX_USER_AGENTS)
-                    context_kwargs = dict(
-                        user_agent=ua,
-                        viewport=vp,
-                        locale="en-US",
-                        timezone_id=tz,
-                        ignore_https_errors=True,
-                        java_script_enabled=True,
-                        has_touch=False,
-                        is_mobile=False,
-                        color_scheme="light",
-                        extra_http_headers={
-                            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-                            "Accept-Language": "en-US,en;q=0.5",
-                            "Accept-Encoding": "gzip, deflate, br",
-                            "DNT": "1",
-                            "Sec-Fetch-Dest": "document",
-                            "Sec-Fetch-Mode": "navigate",
-                            "Sec-Fetch-Site": "none",
-                            "Sec-Fetch-User": "?1",
-                            "Upgrade-Insecure-Requests": "1",
-                        },
-                    )
-                else:
-                    ua = random.choice(CHROME_USER_AGENTS)
-                    context_kwargs = dict(
-                        user_agent=ua,
-                        viewport=vp,
-                        locale="en-US",
-                        timezone_id=tz,
-                        ignore_https_errors=True,
-                        java_script_enabled=True,
-                        has_touch=False,
-                        is_mobile=False,
-                        color_scheme="light",
-                        extra_http_headers={
-                            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-                            "Accept-Language": "en-US,en;q=0.9",
-                            "Accept-Encoding": "gzip, deflate, br",
-                            "Sec-Ch-Ua": '"Chromium";v="125", "Google Chrome";v="125", "Not-A.Brand";v="99"',
-                            "Sec-Ch-Ua-Mobile": "?0",
-                            "Sec-Ch-Ua-Platform": '"Windows"' if "Win" in ua else '"macOS"' if "Mac" in ua else '"Linux"',
-                            "Sec-Fetch-Dest": "document",
-                            "Sec-Fetch-Mode": "navigate",
-                            "Sec-Fetch-Site": "none",
-                            "Sec-Fetch-User": "?1",
-                            "Upgrade-Insecure-Requests": "1",
-                        },
+        load[engine] += 1
+        try:
+            async with self._semaphores[engine]:
+                active_browser_contexts.inc()
+                try:
+                    # Proxies are a per-context setting, so proxied pages always
+                    # get a fresh context with a unique session fingerprint
+                    pooled = (
+                        self.share_contexts
+                        and not proxy
+                        and not isolated
+                        and settings.BROWSER_CONTEXT_POOL_SIZE > 0
                     )
-
-                if proxy:
-                    context_kwargs["proxy"] = proxy
-
-                context: BrowserContext = await browser.new_context(**context_kwargs)
-
-                # Restore cookies from previous sessions for this domain
-                if target_url:
-                    await self._restore_cookies(context, target_url)
-
-                if stealth:
-                    if is_firefox:
-                        script = _build_firefox_stealth(hw_concurrency)
+                    if pooled:
+                        context = await self.acquire_context(browser, stealth, is_firefox)
                     else:
-                        script = _build_chromium_stealth(
-                            webgl_vendor, webgl_renderer, color_depth,
-                            hw_concurrency, device_mem,
+                        fp = sample_fingerprint(firefox=is_firefox)
+                        context = await self.new_context(
+                            browser, fp, proxy=proxy, stealth=stealth, firefox=is_firefox,
                         )
-                    await context.add_init_script(script)
 
-                page: Page = await context.new_page()
-                try:
-                    yield page
+                    try:
+                        # Restore cookies from previous sessions for this domain
+                        if target_url:
+                            await self._restore_cookies(context, target_url)
+
+                        page: Page = await context.new_page()
+                        try:
+                            yield page
+                        finally:
+                            # Save cookies before closing
+                            if target_url:
+                                await self._save_cookies(context, target_url)
+                            await page.close()
+                    finally:
+                        if pooled:
+                            await self.release_context(context)
+                        else:
+                            await context.close()
                 finally:
-                    # Save cookies before closing
-                    if target_url:
-                        await self._save_cookies(context, target_url)
-                    await page.close()
-                    await context.close()
-            finally:
-                active_browser_contexts.dec()
+                    active_browser_contexts.dec()
+        finally:
+            load[engine] -= 1
 
     async def execute_actions(self, page: Page, actions: list[dict]) -> list[str]:
         """Execute a list of browser actions on the page."""
         screenshots = []
-        for action in actions:
+        i = 0
+        while i < len(actions):
+            action = actions[i]
             action_type = action.get("type", "")
+            i += 1
 
             if action_type == "click":
                 selector = action.get("selector", "")
@@ -892,10 +1190,16 @@ class BrowserPool:
                     await page.click(selector, timeout=5000)
 
             elif action_type == "type":
-                selector = action.get("selector", "")
-                text = action.get("text", "")
-                if selector and text:
-                    await page.fill(selector, text)
+                # Consecutive "type" actions are filled in one round trip
+                fields = [action]
+                while i < len(actions) and actions[i].get("type", "") == "type":
+                    fields.append(actions[i])
+                    i += 1
+                await self._fill_fields(page, [
+                    (f.get("selector", ""), f.get("text", ""))
+                    for f in fields
+                    if f.get("selector", "") and f.get("text", "")
+                ])
 
             elif action_type == "wait":
                 ms = action.get("milliseconds", 1000)
@@ -914,6 +1218,25 @@ class BrowserPool:
 
         return screenshots
 
+    async def _fill_fields(self, page: Page, fields: list[tuple[str, str]]):
+        """Fill several form fields in order, batching plain inputs into one evaluate().
+
+        A field the in-page fill can't handle (Playwright-only selectors,
+        missing or hidden elements, non-text inputs, contenteditable,
+        disabled) ends the batch and goes to page.fill, which also waits for
+        the element to appear; batching resumes with the field after it.
+        """
+        while fields:
+            done = 0
+            if len(fields) > 1:
+                done = await page.evaluate(
+                    _FILL_FIELDS_JS, [{"selector": sel, "text": text} for sel, text in fields],
+                )
+            if done < len(fields):
+                await page.fill(*fields[done])
+                done += 1
+            fields = fields[done:]
+
 
 # Global browser pool instance
 browser_pool = BrowserPool()
@@ -1,16 +1,21 @@
-import json
+import asyncio
 import logging
 import math
 import re
+from functools import lru_cache
+from html import unescape
 from urllib.parse import urljoin, urlparse
 
+import orjson
 from bs4 import BeautifulSoup, NavigableString, Tag
 from markdownify import MarkdownConverter
 
+from app.schemas.scrape import Heading, ImageInfo
+
 logger = logging.getLogger(__name__)
 
 # Tags that are always junk
-JUNK_TAGS = {"script", "style", "noscript", "iframe", "svg", "path", "meta", "link"}
+JUNK_TAGS = frozenset({"script", "style", "noscript", "iframe", "svg", "path", "meta", "link"})
 
 # Selectors for elements that are typically navigation/boilerplate
 BOILERPLATE_SELECTORS = [
@@ -22,6 +27,10 @@ BOILERPLATE_SELECTORS = [
     ".gdpr-banner",
 ]
 
+# Each is matched in a single tree walk
+_JUNK_TAG_NAMES = sorted(JUNK_TAGS)
+_BOILERPLATE_SELECTOR = ", ".join(BOILERPLATE_SELECTORS)
+
 # Selectors for elements that should ALWAYS be kept (even if they look like nav)
 PRESERVE_SELECTORS = [
     "main",
@@ -37,44 +46,85 @@ PRESERVE_SELECTORS = [
     ".review",
 ]
 
+# JSON-LD blocks larger than this are skipped rather than parsed
+MAX_JSON_LD_CHARS = 1_000_000
+
+# Semantic main-content containers, in priority order (matched in
+# _main_container_ranks, which must stay in sync)
+MAIN_CONTAINER_SELECTORS = ("main", "article", "[role='main']", "#content", "#main-content", ".main-content")
+_MAIN_CONTAINER_SELECTOR = ", ".join(MAIN_CONTAINER_SELECTORS)
+
+# Text length above which an explicit main/article container skips trafilatura
+MAIN_CONTAINER_CONFIDENT_CHARS = 1500
+
+# Markdown post-processing patterns
+_RE_MULTI_NL = re.compile(r"\n{3,}")
+_RE_TRAIL_WS = re.compile(r"[ \t]+\n")
+_RE_MULTI_SP = re.compile(r"([^\n]) {3,}")
+
+# Any markup tag, for measuring text in generated HTML
+_RE_TAG = re.compile(r"<[^>]*>")
+
+# Whitespace-delimited word, for word counts
+_RE_WORD = re.compile(r"\S+")
+
+# Heading tags, matched by name rather than by regex on every tag
+HEADING_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+
+
+def _as_soup(html: str | BeautifulSoup) -> BeautifulSoup:
+    """Parse HTML, or pass through a soup the caller already parsed."""
+    if isinstance(html, BeautifulSoup):
+        return html
+    return BeautifulSoup(html, "lxml")
+
+
+@lru_cache(maxsize=8192)
+def _cached_urlparse(url: str):
+    """urlparse with memoization — nav/footer links repeat across a crawl's pages."""
+    return urlparse(url)
+
+
+def _resolve_url(base_url: str, href: str) -> str:
+    """urljoin, skipped for hrefs that are already absolute and normalized."""
+    # urljoin would still resolve dot segments, so those take the slow path
+    if href.startswith(("http://", "https://")) and "/." not in href:
+        return href
+    return urljoin(base_url, href)
+
 
 class WebHarvestConverter(MarkdownConverter):
     """Custom markdown converter that preserves links, structure, and all content."""
 
     def convert_a(self, el, text, *args, **kwargs):
         """Preserve links with their text and href."""
-        href = el.get("href", "")
-        title = el.get("title", "")
+        attrs = el.attrs
+        href = attrs.get("href")
         text = (text or "").strip()
 
-        if not text or not href:
-            return text or ""
-
-        # Skip anchor-only links
-        if href.startswith("#") and len(href) <= 1:
+        # Skip empty and anchor-only links
+        if not text or not href or href == "#":
             return text
 
+        title = attrs.get("title")
         if title:
             return f"[{text}]({href} \"{title}\")"
         return f"[{text}]({href})"
 
     def convert_img(self, el, text, *args, **kwargs):
         """Convert images to markdown with alt text."""
-        alt = el.get("alt", "")
-        src = el.get("src", "")
+        attrs = el.attrs
+        src = attrs.get("src")
         if not src:
             return ""
-        if alt:
-            return f"![{alt}]({src})"
-        return f"![]({src})"
+        return f"![{attrs.get('alt') or ''}]({src})"
 
     def convert_pre(self, el, text, *args, **kwargs):
         """Preserve code blocks."""
         code = el.find("code")
         lang = ""
         if code:
-            classes = code.get("class", [])
-            for cls in classes:
+            for cls in code.attrs.get("class", ()):
                 if cls.startswith("language-"):
                     lang = cls[9:]
                     break
@@ -93,33 +143,75 @@ def extract_main_content(html: str, url: str = "") -> str:
     2. Try to find explicit main content container
     3. If no container found, use smart body extraction
     4. Compare trafilatura result - use whichever is more complete
+       (skipped when the container from step 2 already has ample text)
     5. Never throw away card grids, structured data, or link-rich content
     """
+    bs4_html, bs4_text_len, confident, soup = _bs4_extract(html)
+    if confident:
+        return bs4_html
+    traf_html, traf_text_len = _trafilatura_extract(html, url)
+    return _pick_content(bs4_html, bs4_text_len, traf_html, traf_text_len, soup)
+
+
+async def extract_main_content_async(html: str, url: str = "") -> str:
+    """
+    extract_main_content for async callers.
+
+    Both passes run in worker threads (lxml releases the GIL while parsing)
+    so neither blocks the event loop. Trafilatura is only started once the
+    BS4 container turns out not to be confident, as in the sync version.
+    """
+    bs4_html, bs4_text_len, confident, soup = await asyncio.to_thread(_bs4_extract, html)
+    if confident:
+        return bs4_html
+    traf_html, traf_text_len = await asyncio.to_thread(_trafilatura_extract, html, url)
+    return _pick_content(bs4_html, bs4_text_len, traf_html, traf_text_len, soup)
+
+
+def _bs4_extract(html: str) -> tuple[str, int, bool, BeautifulSoup]:
+    """
+    BS4 side of extract_main_content.
+
+    Returns the candidate HTML, its text length, whether it came from an
+    explicit container with ample text, and the cleaned soup.
+    """
     soup = BeautifulSoup(html, "lxml")
 
     # Step 1: Remove definite junk
-    for tag in soup.find_all(list(JUNK_TAGS)):
+    for tag in soup.find_all(_JUNK_TAG_NAMES):
         tag.decompose()
 
     # Step 2: Remove obvious boilerplate (but be conservative)
-    for selector in BOILERPLATE_SELECTORS:
-        for el in soup.select(selector):
-            # Don't remove if it contains substantial content
-            text_len = len(el.get_text(strip=True))
-            if text_len < 200:
-                el.decompose()
+    for el in soup.select(_BOILERPLATE_SELECTOR):
+        # Already gone with an enclosing match
+        if el.decomposed:
+            continue
+        # Don't remove if it contains substantial content
+        text_len = len(el.get_text(strip=True))
+        if text_len < 200:
+            el.decompose()
 
     # Step 3: Try to find main content container
     main_content = _find_main_container(soup)
 
+    # An explicit container with plenty of text is trusted as-is rather than
+    # paying for trafilatura's own parse and extraction of the whole page
+    if main_content:
+        bs4_text_len = len(main_content.get_text(strip=True))
+        if bs4_text_len > MAIN_CONTAINER_CONFIDENT_CHARS:
+            return str(main_content), bs4_text_len, True, soup
+
     # Step 4: Smart body extraction as fallback
     if not main_content:
         main_content = _smart_body_extract(soup)
+        bs4_text_len = len(main_content.get_text(strip=True)) if main_content else 0
 
-    # Step 5: Compare with trafilatura and pick the more complete result
     bs4_html = str(main_content) if main_content else ""
-    bs4_text_len = len(BeautifulSoup(bs4_html, "lxml").get_text(strip=True)) if bs4_html else 0
+    return bs4_html, bs4_text_len, False, soup
 
+
+def _trafilatura_extract(html: str, url: str) -> tuple[str, int]:
+    """Trafilatura side of extract_main_content: its HTML and text length."""
     traf_html = ""
     try:
         import trafilatura
@@ -137,9 +229,23 @@ def extract_main_content(html: str, url: str = "") -> str:
     except Exception as e:
         logger.debug(f"Trafilatura extraction failed: {e}")
 
-    traf_text_len = len(BeautifulSoup(traf_html, "lxml").get_text(strip=True)) if traf_html else 0
+    traf_text_len = _html_text_len(traf_html) if traf_html else 0
+    return traf_html, traf_text_len
+
 
-    # Pick whichever captured MORE content (the key insight - trafilatura is often too aggressive)
+def _html_text_len(fragment: str) -> int:
+    """
+    Length of get_text(strip=True) for trafilatura's well-formed output,
+    computed by splitting on tags instead of parsing the fragment again.
+    """
+    return sum(len(unescape(text).strip()) for text in _RE_TAG.split(fragment))
+
+
+def _pick_content(
+    bs4_html: str, bs4_text_len: int, traf_html: str, traf_text_len: int, soup: BeautifulSoup
+) -> str:
+    """Step 5: pick whichever extraction captured more content."""
+    # The key insight - trafilatura is often too aggressive
     if bs4_text_len > traf_text_len * 1.2:
         logger.debug(f"Using BS4 extraction ({bs4_text_len} chars > trafilatura {traf_text_len} chars)")
         return bs4_html
@@ -150,11 +256,37 @@ def extract_main_content(html: str, url: str = "") -> str:
         return bs4_html or str(soup.body) if soup.body else str(soup)
 
 
+def _main_container_ranks(el: Tag) -> list[int]:
+    """Positions in MAIN_CONTAINER_SELECTORS that ``el`` matches."""
+    attrs = el.attrs
+    el_id = attrs.get("id")
+    ranks = []
+    if el.name == "main":
+        ranks.append(0)
+    if el.name == "article":
+        ranks.append(1)
+    if attrs.get("role") == "main":
+        ranks.append(2)
+    if el_id == "content":
+        ranks.append(3)
+    if el_id == "main-content":
+        ranks.append(4)
+    if "main-content" in attrs.get("class", ()):
+        ranks.append(5)
+    return ranks
+
+
 def _find_main_container(soup: BeautifulSoup) -> Tag | None:
     """Find the main content container using semantic HTML and heuristics."""
-    # Try semantic containers first
-    for selector in ["main", "article", "[role='main']", "#content", "#main-content", ".main-content"]:
-        el = soup.select_one(selector)
+    # One walk finds every candidate; the first element per selector is then
+    # tried in selector priority order, as separate select_one calls would
+    firsts: list[Tag | None] = [None] * len(MAIN_CONTAINER_SELECTORS)
+    for el in soup.select(_MAIN_CONTAINER_SELECTOR):
+        for rank in _main_container_ranks(el):
+            if firsts[rank] is None:
+                firsts[rank] = el
+
+    for el in firsts:
         if el and len(el.get_text(strip=True)) > 200:
             return el
 
@@ -205,56 +337,61 @@ def apply_tag_filters(
     return str(soup)
 
 
+# Shared so its per-tag convert_* lookup cache persists across pages; lxml
+# parses the input noticeably faster than markdownify's default html.parser
+_MARKDOWN_CONVERTER = WebHarvestConverter(
+    heading_style="ATX",
+    bullets="-",
+    newline_style="backslash",
+    strip=["script", "style", "noscript"],
+    bs4_options="lxml",
+)
+
+
 def html_to_markdown(html: str) -> str:
     """
     Convert HTML to clean GitHub Flavored Markdown.
     Uses custom converter that preserves links, images, code blocks, and structure.
     """
-    converter = WebHarvestConverter(
-        heading_style="ATX",
-        bullets="-",
-        newline_style="backslash",
-        strip=["script", "style", "noscript"],
-    )
-    markdown = converter.convert(html)
+    markdown = _MARKDOWN_CONVERTER.convert(html)
 
     # Post-processing: clean up but preserve structure
     # Collapse 3+ newlines into 2
-    markdown = re.sub(r"\n{3,}", "\n\n", markdown)
+    markdown = _RE_MULTI_NL.sub("\n\n", markdown)
     # Remove trailing whitespace on lines
-    markdown = re.sub(r"[ \t]+\n", "\n", markdown)
+    markdown = _RE_TRAIL_WS.sub("\n", markdown)
     # Remove excessive spaces (but preserve indentation)
-    markdown = re.sub(r"([^\n]) {3,}", r"\1 ", markdown)
+    markdown = _RE_MULTI_SP.sub(r"\1 ", markdown)
     markdown = markdown.strip()
 
     return markdown
 
 
-def extract_links(html: str, base_url: str) -> list[str]:
+def extract_links(html: str | BeautifulSoup, base_url: str) -> list[str]:
     """Extract all links from HTML, resolved to absolute URLs."""
-    soup = BeautifulSoup(html, "lxml")
+    soup = _as_soup(html)
     links = set()
 
     for a_tag in soup.find_all("a", href=True):
         href = a_tag["href"].strip()
         if href.startswith(("#", "mailto:", "tel:", "javascript:")):
             continue
-        absolute = urljoin(base_url, href)
+        absolute = _resolve_url(base_url, href)
         # Remove fragments
-        parsed = urlparse(absolute)
+        parsed = _cached_urlparse(absolute)
         clean_url = parsed._replace(fragment="").geturl()
         links.add(clean_url)
 
     return sorted(links)
 
 
-def extract_links_detailed(html: str, base_url: str) -> dict:
+def extract_links_detailed(html: str | BeautifulSoup, base_url: str) -> dict:
     """
     Extract detailed link analysis - internal vs external, with anchor text.
     Much richer than Firecrawl's simple link list.
     """
-    soup = BeautifulSoup(html, "lxml")
-    base_domain = urlparse(base_url).netloc
+    soup = _as_soup(html)
+    base_domain = _cached_urlparse(base_url).netloc
 
     internal = []
     external = []
@@ -264,8 +401,8 @@ def extract_links_detailed(html: str, base_url: str) -> dict:
         if href.startswith(("#", "mailto:", "tel:", "javascript:")):
             continue
 
-        absolute = urljoin(base_url, href)
-        parsed = urlparse(absolute)
+        absolute = _resolve_url(base_url, href)
+        parsed = _cached_urlparse(absolute)
         clean_url = parsed._replace(fragment="").geturl()
         text = a_tag.get_text(strip=True)
         title = a_tag.get("title", "")
@@ -295,7 +432,7 @@ def extract_links_detailed(html: str, base_url: str) -> dict:
     }
 
 
-def extract_structured_data(html: str) -> dict:
+def extract_structured_data(html: str | BeautifulSoup) -> dict:
     """
     Extract all structured/semantic data embedded in the HTML.
 
@@ -309,7 +446,7 @@ def extract_structured_data(html: str) -> dict:
     This is a killer feature - Firecrawl doesn't do this.
     """
     # Parse the ORIGINAL html (before junk removal) to get script tags
-    soup = BeautifulSoup(html, "lxml")
+    soup = _as_soup(html)
     result = {}
 
     # 1. JSON-LD - the most valuable structured data
@@ -317,60 +454,56 @@ def extract_structured_data(html: str) -> dict:
     for script in soup.find_all("script", type="application/ld+json"):
         try:
             text = script.string or script.get_text()
-            if text:
-                data = json.loads(text)
+            # Skip empty blocks and oversized ones (misconfigured or hostile)
+            if text and len(text) <= MAX_JSON_LD_CHARS:
+                # .string is a NavigableString subclass, which orjson rejects
+                data = orjson.loads(str(text))
                 json_ld.append(data)
-        except (json.JSONDecodeError, TypeError):
+        except (orjson.JSONDecodeError, TypeError):
             pass
     if json_ld:
         result["json_ld"] = json_ld
 
-    # 2. OpenGraph tags
+    # 2-4. OpenGraph, Twitter Card and all meta tags, in one pass
     og = {}
+    twitter = {}
+    meta_tags = {}
     for meta in soup.find_all("meta"):
-        prop = meta.get("property", "")
+        attrs = meta.attrs
+        prop = attrs.get("property", "")
+        name = attrs.get("name", "")
+        content = attrs.get("content", "")
         if prop.startswith("og:"):
-            key = prop[3:]
-            og[key] = meta.get("content", "")
+            og[prop[3:]] = content
+        if name.startswith("twitter:"):
+            twitter[name[8:]] = content
+        # Catch-all, keyed by whichever identifying attribute is present
+        key = name or prop or attrs.get("http-equiv")
+        if key and content:
+            meta_tags[key] = content
     if og:
         result["open_graph"] = og
-
-    # 3. Twitter Card tags
-    twitter = {}
-    for meta in soup.find_all("meta"):
-        name = meta.get("name", "")
-        if name.startswith("twitter:"):
-            key = name[8:]
-            twitter[key] = meta.get("content", "")
     if twitter:
         result["twitter_card"] = twitter
-
-    # 4. All meta tags (useful catch-all)
-    meta_tags = {}
-    for meta in soup.find_all("meta"):
-        name = meta.get("name") or meta.get("property") or meta.get("http-equiv")
-        content = meta.get("content", "")
-        if name and content:
-            meta_tags[name] = content
     if meta_tags:
         result["meta_tags"] = meta_tags
 
     return result
 
 
-def extract_headings(html: str) -> list[dict]:
+def extract_headings(html: str | BeautifulSoup) -> list[Heading]:
     """
     Extract heading hierarchy from HTML.
     Returns structured heading tree useful for understanding page structure.
     """
-    soup = BeautifulSoup(html, "lxml")
+    soup = _as_soup(html)
     headings = []
 
-    for tag in soup.find_all(re.compile(r"^h[1-6]$")):
+    for tag in soup.find_all(HEADING_TAGS):
         level = int(tag.name[1])
         text = tag.get_text(strip=True)
         if text:
-            heading_data = {"level": level, "text": text}
+            heading_data: Heading = {"level": level, "text": text}
             # Include id for anchor linking
             tag_id = tag.get("id")
             if tag_id:
@@ -380,17 +513,17 @@ def extract_headings(html: str) -> list[dict]:
     return headings
 
 
-def extract_images(html: str, base_url: str) -> list[dict]:
+def extract_images(html: str | BeautifulSoup, base_url: str) -> list[ImageInfo]:
     """Extract all images with their metadata."""
-    soup = BeautifulSoup(html, "lxml")
+    soup = _as_soup(html)
     images = []
 
     for img in soup.find_all("img"):
         src = img.get("src", "")
         if not src:
             continue
-        absolute_src = urljoin(base_url, src)
-        image_data = {
+        absolute_src = _resolve_url(base_url, src)
+        image_data: ImageInfo = {
             "src": absolute_src,
             "alt": img.get("alt", ""),
         }
@@ -408,29 +541,60 @@ def extract_images(html: str, base_url: str) -> list[dict]:
     return images
 
 
-def extract_metadata(html: str, url: str, status_code: int = 200, response_headers: dict | None = None) -> dict:
+def extract_metadata(
+    html: str | BeautifulSoup,
+    url: str,
+    status_code: int = 200,
+    response_headers: dict | None = None,
+    content_length: int | None = None,
+) -> dict:
     """
     Extract comprehensive page metadata from HTML.
     Much richer than basic title/description - includes SEO signals,
     performance hints, and content analysis.
+
+    ``content_length`` defaults to the length of ``html``; pass it when
+    handing in an already-parsed soup.
     """
-    soup = BeautifulSoup(html, "lxml")
+    soup = _as_soup(html)
 
     title = ""
     title_tag = soup.find("title")
     if title_tag:
         title = title_tag.get_text(strip=True)
 
-    description = ""
-    meta_desc = soup.find("meta", attrs={"name": "description"})
-    if meta_desc:
-        description = meta_desc.get("content", "")
-
-    # Also try og:description
-    if not description:
-        og_desc = soup.find("meta", attrs={"property": "og:description"})
-        if og_desc:
-            description = og_desc.get("content", "")
+    # One walk over <meta>/<link> collects every head signal below; each
+    # keeps the first matching tag, as the per-signal find() calls did
+    first_meta: dict[str, str] = {}
+    canonical = None
+    # Favicon candidates by priority: rel icon, rel shortcut, apple-touch-icon
+    favicons: list[str | None] = [None, None, None]
+    for tag in soup.find_all(["meta", "link"]):
+        attrs = tag.attrs
+        if tag.name == "meta":
+            name = attrs.get("name")
+            if name in ("description", "robots") and name not in first_meta:
+                first_meta[name] = attrs.get("content", "")
+            prop = attrs.get("property")
+            if prop in ("og:description", "og:image") and prop not in first_meta:
+                first_meta[prop] = attrs.get("content", "")
+        else:
+            rel = attrs.get("rel") or ()
+            if canonical is None and "canonical" in rel:
+                canonical = attrs.get("href", "")
+            if "icon" in rel:
+                slot = 0
+            elif "shortcut" in rel:
+                slot = 1
+            elif "apple-touch-icon" in rel:
+                slot = 2
+            else:
+                continue
+            if favicons[slot] is None:
+                favicons[slot] = attrs.get("href", "")
+
+    # Fall back to og:description
+    description = first_meta.get("description") or first_meta.get("og:description", "")
 
     language = ""
     html_tag = soup.find("html")
@@ -438,44 +602,35 @@ def extract_metadata(html: str, url: str, status_code: int = 200, response_heade
         language = html_tag.get("lang", "")
 
     # Open Graph image
-    og_image = ""
-    og_img_tag = soup.find("meta", attrs={"property": "og:image"})
-    if og_img_tag:
-        og_image = og_img_tag.get("content", "")
+    og_image = first_meta.get("og:image", "")
 
     # Canonical URL
-    canonical = ""
-    canonical_tag = soup.find("link", attrs={"rel": "canonical"})
-    if canonical_tag:
-        canonical = canonical_tag.get("href", "")
+    canonical = canonical or ""
 
     # Favicon
     favicon = ""
-    for rel_type in [["icon"], ["shortcut", "icon"], ["apple-touch-icon"]]:
-        fav_tag = soup.find("link", attrs={"rel": rel_type})
-        if fav_tag:
-            favicon = urljoin(url, fav_tag.get("href", ""))
+    for href in favicons:
+        if href is not None:
+            favicon = urljoin(url, href)
             break
 
     # Robots meta
-    robots = ""
-    robots_meta = soup.find("meta", attrs={"name": "robots"})
-    if robots_meta:
-        robots = robots_meta.get("content", "")
+    robots = first_meta.get("robots", "")
 
     # Count words in body text
     body = soup.find("body")
     word_count = 0
-    body_text = ""
     if body:
         body_text = body.get_text(separator=" ", strip=True)
-        word_count = len(body_text.split())
+        # Count tokens without materializing a list of every word
+        word_count = sum(1 for _ in _RE_WORD.finditer(body_text))
 
     # Reading time estimate (average 200 words per minute)
     reading_time_seconds = math.ceil(word_count / 200) * 60 if word_count > 0 else 0
 
     # Content size
-    content_length = len(html)
+    if content_length is None:
+        content_length = len(html) if isinstance(html, str) else len(str(soup))
 
     result = {
         "title": title,
@@ -511,3 +666,37 @@ def extract_metadata(html: str, url: str, status_code: int = 200, response_heade
             result["response_headers"] = useful_headers
 
     return result
+
+
+def extract_all(
+    html: str,
+    url: str,
+    formats: list[str] | None = None,
+    status_code: int = 200,
+    response_headers: dict | None = None,
+) -> dict:
+    """
+    Run the read-only extractors over a single parse of ``html``.
+
+    ``formats`` selects the optional outputs (links, structured_data,
+    headings, images), all of them when None; metadata is always included.
+    Content cleanup (extract_main_content, apply_tag_filters) mutates its
+    tree, so it keeps its own parse.
+    """
+    soup = _as_soup(html)
+    result: dict = {}
+
+    if formats is None or "links" in formats:
+        result["links"] = extract_links(soup, url)
+        result["links_detail"] = extract_links_detailed(soup, url)
+    if formats is None or "structured_data" in formats:
+        result["structured_data"] = extract_structured_data(soup)
+    if formats is None or "headings" in formats:
+        result["headings"] = extract_headings(soup)
+    if formats is None or "images" in formats:
+        result["images"] = extract_images(soup, url)
+
+    result["metadata"] = extract_metadata(
+        soup, url, status_code, response_headers, content_length=len(html),
+    )
+    return result
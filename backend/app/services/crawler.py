@@ -1,5 +1,9 @@
+import asyncio
 import fnmatch
 import logging
+import re
+from functools import lru_cache
+from hashlib import blake2b
 from urllib.parse import urljoin, urlparse
 
 import httpx
@@ -10,22 +14,117 @@ from app.config import settings
 from app.schemas.crawl import CrawlRequest, ScrapeOptions
 from app.schemas.scrape import ScrapeRequest
 from app.services.content import extract_links
+from app.services.dedup import normalize_url
 from app.services.scraper import scrape_url
 
 logger = logging.getLogger(__name__)
 
+# Raw robots.txt files are shared across crawls for a day
+ROBOTS_CACHE_PREFIX = "robots:"
+ROBOTS_CACHE_TTL = 86400
+
+# Common non-page extensions the crawler never queues
+SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp",
+    ".mp4", ".mp3", ".zip", ".tar", ".gz", ".css", ".js",
+)
+
+
+def _compile_globs(patterns: list[str] | None) -> re.Pattern | None:
+    """Union fnmatch-style path patterns into one compiled regex."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+@lru_cache(maxsize=131072)
+def _url_allowed(
+    url: str,
+    base_domain: str,
+    allow_external: bool,
+    include_re: re.Pattern | None,
+    exclude_re: re.Pattern | None,
+) -> bool:
+    """Depth-independent part of WebCrawler._should_crawl.
+
+    The same links show up on most pages of a site, so the parse and pattern
+    checks are cached across the crawl.
+    """
+    parsed = urlparse(url)
+
+    # Check domain (unless external links allowed)
+    if not allow_external and parsed.netloc != base_domain:
+        return False
+
+    # Skip non-HTTP schemes
+    if parsed.scheme not in ("http", "https"):
+        return False
+
+    # Skip common non-page extensions
+    if parsed.path.lower().endswith(SKIP_EXTENSIONS):
+        return False
+
+    path = parsed.path
+
+    # Check include paths
+    if include_re and not include_re.match(path):
+        return False
+
+    # Check exclude paths
+    return not (exclude_re and exclude_re.match(path))
+
+
+def _robots_domain(url: str) -> str:
+    """scheme://netloc of a URL, the key robots.txt rules are cached under."""
+    head = url.split("/", 3)
+    if url.startswith(("http://", "https://")) and "?" not in head[2] and "#" not in head[2]:
+        return f"{head[0]}//{head[2]}"
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _visited_member(url: str) -> str:
+    """Fixed-size visited-set member for a URL.
+
+    A 64-bit digest keeps the set small on large crawls while staying exact
+    enough for dedup (collisions are negligible below billions of URLs).
+    """
+    return blake2b(url.encode(), digest_size=8).hexdigest()
+
 
 class WebCrawler:
     """BFS web crawler with Redis-backed frontier and visited set."""
 
+    __slots__ = (
+        "_curl",
+        "_depth_key",
+        "_exclude_re",
+        "_frontier_key",
+        "_http",
+        "_include_re",
+        "_proxy_manager",
+        "_redis",
+        "_robots_cache",
+        "_visited_key",
+        "base_domain",
+        "base_url",
+        "config",
+        "job_id",
+    )
+
     def __init__(self, job_id: str, config: CrawlRequest, proxy_manager=None):
         self.job_id = job_id
         self.config = config
         self.base_url = config.url
         self.base_domain = urlparse(config.url).netloc
-        self._robots_cache: dict[str, RobotExclusionRulesParser] = {}
+        self._robots_cache: dict[str, asyncio.Task[RobotExclusionRulesParser]] = {}
         self._redis: aioredis.Redis | None = None
+        # Shared robots.txt clients, created on first use and closed in cleanup
+        self._curl = None
+        self._http: httpx.AsyncClient | None = None
         self._proxy_manager = proxy_manager
+        self._include_re = _compile_globs(config.include_paths)
+        self._exclude_re = _compile_globs(config.exclude_paths)
 
         # Redis keys for this crawl
         self._frontier_key = f"crawl:{job_id}:frontier"
@@ -41,25 +140,34 @@ class WebCrawler:
             decode_responses=True,
         )
 
-        await self._redis.sadd(self._frontier_key, self.base_url)
-        await self._redis.hset(self._depth_key, self.base_url, 0)
-        # Set TTL on all keys (24 hours)
-        for key in [self._frontier_key, self._visited_key, self._depth_key]:
-            await self._redis.expire(key, 86400)
-
-    async def get_next_url(self) -> tuple[str, int] | None:
-        """Pop the next URL from the frontier. Returns (url, depth) or None."""
-        url = await self._redis.spop(self._frontier_key)
-        if not url:
-            return None
-        depth = await self._redis.hget(self._depth_key, url)
-        return url, int(depth or 0)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(self._frontier_key, self.base_url)
+            pipe.hset(self._depth_key, self.base_url, 0)
+            # Set TTL on all keys (24 hours)
+            for key in [self._frontier_key, self._visited_key, self._depth_key]:
+                pipe.expire(key, 86400)
+            await pipe.execute()
+
+        # Fetch the start domain's robots.txt while the first page is scraped
+        if self.config.respect_robots_txt:
+            self._robots_task(_robots_domain(self.base_url))
+
+    async def get_next_urls(self, n: int) -> list[tuple[str, int]]:
+        """Pop up to n URLs from the frontier. Returns a list of (url, depth)."""
+        urls = await self._redis.spop(self._frontier_key, n)
+        if not urls:
+            return []
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(self._depth_key, urls)
+            pipe.hdel(self._depth_key, *urls)
+            depths, _ = await pipe.execute()
+        return [(url, int(depth or 0)) for url, depth in zip(urls, depths)]
 
     async def mark_visited(self, url: str):
-        await self._redis.sadd(self._visited_key, url)
+        await self._redis.sadd(self._visited_key, _visited_member(url))
 
     async def is_visited(self, url: str) -> bool:
-        return await self._redis.sismember(self._visited_key, url)
+        return await self._redis.sismember(self._visited_key, _visited_member(url))
 
     async def get_visited_count(self) -> int:
         return await self._redis.scard(self._visited_key)
@@ -69,90 +177,117 @@ class WebCrawler:
 
     async def add_to_frontier(self, urls: list[str], depth: int):
         """Add discovered URLs to the frontier after filtering."""
-        for url in urls:
-            if await self.is_visited(url):
-                continue
-            if not self._should_crawl(url, depth):
-                continue
+        candidates = [url for url in dict.fromkeys(urls) if self._should_crawl(url, depth)]
+        if not candidates:
+            return
+
+        # One round-trip for every membership check plus the two set sizes
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.smismember(self._visited_key, [_visited_member(url) for url in candidates])
+            pipe.smismember(self._frontier_key, candidates)
+            pipe.scard(self._visited_key)
+            pipe.scard(self._frontier_key)
+            visited, queued, visited_count, frontier_size = await pipe.execute()
+        budget = self.config.max_pages - visited_count - frontier_size
+        if budget <= 0:
+            return
+
+        # URLs already waiting in the frontier are neither re-added nor
+        # charged against the budget; only genuinely new ones count
+        unvisited = [
+            url for url, seen, pending in zip(candidates, visited, queued) if not seen and not pending
+        ]
+        if self.config.respect_robots_txt:
+            # Load robots.txt for every new domain in the batch concurrently
+            await asyncio.gather(
+                *(self._robots_task(domain) for domain in {_robots_domain(url) for url in unvisited})
+            )
+
+        new_urls = []
+        for url in unvisited:
+            if budget <= 0:
+                break
             if self.config.respect_robots_txt and not await self._is_allowed_by_robots(url):
                 continue
+            new_urls.append(url)
+            budget -= 1
 
-            visited_count = await self.get_visited_count()
-            frontier_size = await self.get_frontier_size()
-            if visited_count + frontier_size >= self.config.max_pages:
-                break
-
-            await self._redis.sadd(self._frontier_key, url)
-            await self._redis.hset(self._depth_key, url, depth)
+        if not new_urls:
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(self._frontier_key, *new_urls)
+            pipe.hset(self._depth_key, mapping=dict.fromkeys(new_urls, depth))
+            await pipe.execute()
 
     def _should_crawl(self, url: str, depth: int) -> bool:
         """Check if a URL should be crawled based on config filters."""
-        parsed = urlparse(url)
-
         # Check depth
         if depth > self.config.max_depth:
             return False
 
-        # Check domain (unless external links allowed)
-        if not self.config.allow_external_links and parsed.netloc != self.base_domain:
-            return False
-
-        # Skip non-HTTP schemes
-        if parsed.scheme not in ("http", "https"):
-            return False
-
-        # Skip common non-page extensions
-        skip_extensions = {
-            ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp",
-            ".mp4", ".mp3", ".zip", ".tar", ".gz", ".css", ".js",
-        }
-        path_lower = parsed.path.lower()
-        if any(path_lower.endswith(ext) for ext in skip_extensions):
-            return False
-
-        path = parsed.path
-
-        # Check include paths
-        if self.config.include_paths:
-            if not any(fnmatch.fnmatch(path, pattern) for pattern in self.config.include_paths):
-                return False
-
-        # Check exclude paths
-        if self.config.exclude_paths:
-            if any(fnmatch.fnmatch(path, pattern) for pattern in self.config.exclude_paths):
-                return False
-
-        return True
+        return _url_allowed(
+            url,
+            self.base_domain,
+            self.config.allow_external_links,
+            self._include_re,
+            self._exclude_re,
+        )
 
     async def _is_allowed_by_robots(self, url: str) -> bool:
         """Check robots.txt for the given URL."""
-        parsed = urlparse(url)
-        domain = f"{parsed.scheme}://{parsed.netloc}"
+        parser = await self._robots_task(_robots_domain(url))
+        return parser.is_allowed("*", url)
+
+    def _robots_task(self, domain: str) -> asyncio.Task[RobotExclusionRulesParser]:
+        """Start loading robots.txt for a domain once; later callers share the task."""
+        task = self._robots_cache.get(domain)
+        if task is None:
+            task = asyncio.create_task(self._load_robots(domain))
+            self._robots_cache[domain] = task
+        return task
+
+    async def _load_robots(self, domain: str) -> RobotExclusionRulesParser:
+        """Parse robots.txt for a domain, sharing the raw file across workers via Redis."""
+        parser = RobotExclusionRulesParser()
+        cache_key = f"{ROBOTS_CACHE_PREFIX}{domain}"
+        text = await self._redis.get(cache_key)
+        if text is None:
+            fetched = await self._fetch_robots(f"{domain}/robots.txt")
+            if fetched is None:
+                return parser  # Network error = allow all, cache empty parser
+            status, body = fetched
+            text = body if status == 200 else ""
+            # Only definitive answers are shared across crawls. A 5xx or 429
+            # is transient: allow all for this crawl only, and retry next time
+            if status == 200 or (400 <= status < 500 and status != 429):
+                await self._redis.setex(cache_key, ROBOTS_CACHE_TTL, text)
+        if text:
+            try:
+                parser.parse(text)
+            except Exception:
+                pass  # Unparseable robots.txt = allow all
+        return parser
 
-        if domain not in self._robots_cache:
-            robots_url = f"{domain}/robots.txt"
-            parser = RobotExclusionRulesParser()
+    async def _fetch_robots(self, robots_url: str) -> tuple[int, str] | None:
+        """Fetch robots.txt. Returns (status, body), or None on network error."""
+        try:
+            # Use curl_cffi for TLS impersonation, fall back to httpx
             try:
-                # Use curl_cffi for TLS impersonation, fall back to httpx
-                text = ""
-                try:
+                if self._curl is None:
                     from curl_cffi.requests import AsyncSession
-                    async with AsyncSession(impersonate="chrome124") as session:
-                        resp = await session.get(robots_url, timeout=10, allow_redirects=True)
-                        if resp.status_code == 200:
-                            text = resp.text
-                except Exception:
-                    async with httpx.AsyncClient(timeout=10) as client:
-                        resp = await client.get(robots_url)
-                        if resp.status_code == 200:
-                            text = resp.text
-                if text:
-                    parser.parse(text)
+                    self._curl = AsyncSession(impersonate="chrome124")
+                resp = await self._curl.get(robots_url, timeout=10, allow_redirects=True)
             except Exception:
-                pass  # Network error = allow all, cache empty parser
-            self._robots_cache[domain] = parser
-
-        return self._robots_cache[domain].is_allowed("*", url)
+                if self._http is None:
+                    self._http = httpx.AsyncClient(
+                        timeout=10,
+                        http2=True,
+                        limits=httpx.Limits(max_keepalive_connections=100),
+                    )
+                resp = await self._http.get(robots_url)
+        except Exception:
+            return None
+        return resp.status_code, resp.text
 
     async def scrape_page(self, url: str) -> dict:
         """Scrape a single page using the crawler's scrape options."""
@@ -183,8 +318,17 @@ class WebCrawler:
         }
 
     async def cleanup(self):
-        """Remove Redis keys and close the connection."""
+        """Remove Redis keys and close the Redis and HTTP connections."""
+        for task in self._robots_cache.values():
+            task.cancel()
+        if self._curl is not None:
+            await self._curl.close()
+            self._curl = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
         if self._redis:
             await self._redis.delete(self._frontier_key, self._visited_key, self._depth_key)
             await self._redis.aclose()
             self._redis = None
+        normalize_url.cache_clear()
@@ -1,11 +1,14 @@
 """URL deduplication and normalization service."""
 
+import asyncio
 import re
+from functools import lru_cache
+from operator import itemgetter
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 
 
 # Tracking parameters to strip
-_TRACKING_PARAMS = {
+_TRACKING_PARAMS = frozenset({
     "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
     "utm_id", "utm_source_platform", "utm_creative_format",
     "fbclid", "gclid", "gclsrc", "dclid", "gbraid", "wbraid",
@@ -18,9 +21,99 @@ _TRACKING_PARAMS = {
     "__hstc", "__hssc", "__hsfp", "hsCtaTracking",
     "_ga", "_gl", "_hsenc", "_openstat",
     "nb_klid", "plan", "guccounter",
-}
+})
 
+# Lists longer than this are normalized off the event loop
+DEDUP_OFFLOAD_THRESHOLD = 500
 
+_DOUBLE_SLASH = re.compile(r"/{2,}")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# name[=value] pairs made only of unreserved characters round-trip through
+# parse_qs/urlencode unchanged, so they can be filtered as plain text
+_PLAIN_PAIR = r"[A-Za-z0-9_.~-]*(?:=[A-Za-z0-9_.~-]*)?"
+_PLAIN_QUERY = re.compile(rf"{_PLAIN_PAIR}(?:&{_PLAIN_PAIR})*").fullmatch
+
+
+def _split_plain_url(url: str) -> tuple[str, str, str, str] | None:
+    """Split a plain http(s) URL into (scheme, netloc, path, query).
+
+    Covers the common ``scheme://host[:port]/path?query#fragment`` shape with
+    str.find instead of urlparse. Returns None for anything that needs the
+    full parser: other schemes, userinfo, IPv6 hosts, path params, odd ports,
+    surrounding whitespace or non-ASCII input.
+    """
+    i = url.find("://")
+    if i not in (4, 5):
+        return None
+    scheme = url[:i].lower()
+    if scheme not in _DEFAULT_PORTS:
+        return None
+    if (
+        not url.isascii()
+        or url[0] <= " "
+        or url[-1] <= " "
+        or "\t" in url
+        or "\r" in url
+        or "\n" in url
+    ):
+        return None
+
+    rest = url[i + 3:]
+    hash_at = rest.find("#")
+    if hash_at >= 0:
+        rest = rest[:hash_at]
+    query = ""
+    query_at = rest.find("?")
+    if query_at >= 0:
+        query = rest[query_at + 1:]
+        rest = rest[:query_at]
+    slash_at = rest.find("/")
+    if slash_at >= 0:
+        netloc, path = rest[:slash_at], rest[slash_at:]
+    else:
+        netloc, path = rest, ""
+    if "@" in netloc or "[" in netloc or "]" in netloc or ";" in path:
+        return None
+
+    host, _, port = netloc.partition(":")
+    host = host.lower()
+    if port:
+        if not port.isdigit() or int(port) > 65535:
+            return None
+        port = int(port)
+        if port and port != _DEFAULT_PORTS[scheme]:
+            host = f"{host}:{port}"
+    return scheme, host, path, query
+
+
+def _filter_query(query: str) -> str:
+    """Drop tracking params from a query string and sort the rest by name."""
+    if not query:
+        return ""
+    if not _PLAIN_QUERY(query):
+        # Escapes or reserved characters: let parse_qs/urlencode canonicalize them
+        query_params = parse_qs(query, keep_blank_values=True)
+        filtered_params = {
+            k: v for k, v in sorted(query_params.items())
+            if k.lower() not in _TRACKING_PARAMS
+        }
+        return urlencode(filtered_params, doseq=True) if filtered_params else ""
+
+    # Only unreserved characters, so decoding and re-encoding are no-ops
+    params = []
+    for pair in query.split("&"):
+        if not pair:
+            continue
+        name, _, value = pair.partition("=")
+        if name.lower() not in _TRACKING_PARAMS:
+            params.append((name, value))
+    params.sort(key=itemgetter(0))
+    return "&".join(f"{name}={value}" for name, value in params)
+
+
+@lru_cache(maxsize=200_000)
 def normalize_url(url: str) -> str:
     """Normalize a URL for deduplication.
 
@@ -31,45 +124,47 @@ def normalize_url(url: str) -> str:
     - Remove fragments
     - Collapse // in path
     - Remove default ports (80 for http, 443 for https)
-    """
-    try:
-        parsed = urlparse(url)
-    except Exception:
-        return url.strip()
-
-    # Lowercase scheme and host
-    scheme = (parsed.scheme or "https").lower()
-    host = (parsed.hostname or "").lower()
-    port = parsed.port
 
-    # Remove default ports
-    if (scheme == "http" and port == 80) or (scheme == "https" and port == 443):
-        port = None
-
-    netloc = host
-    if port:
-        netloc = f"{host}:{port}"
-    if parsed.username:
-        userinfo = parsed.username
-        if parsed.password:
-            userinfo += f":{parsed.password}"
-        netloc = f"{userinfo}@{netloc}"
+    Results are memoized: crawls see the same links on many pages.
+    """
+    parts = _split_plain_url(url)
+    if parts is not None:
+        scheme, netloc, path, query = parts
+    else:
+        try:
+            parsed = urlparse(url)
+        except Exception:
+            return url.strip()
+
+        # Lowercase scheme and host
+        scheme = (parsed.scheme or "https").lower()
+        host = (parsed.hostname or "").lower()
+        port = parsed.port
+
+        # Remove default ports
+        if (scheme == "http" and port == 80) or (scheme == "https" and port == 443):
+            port = None
+
+        netloc = host
+        if port:
+            netloc = f"{host}:{port}"
+        if parsed.username:
+            userinfo = parsed.username
+            if parsed.password:
+                userinfo += f":{parsed.password}"
+            netloc = f"{userinfo}@{netloc}"
+        path, query = parsed.path, parsed.query
 
     # Normalize path
-    path = parsed.path or "/"
+    path = path or "/"
     # Collapse double slashes
-    path = re.sub(r"/{2,}", "/", path)
+    path = _DOUBLE_SLASH.sub("/", path)
     # Remove trailing slash (but keep root /)
     if len(path) > 1 and path.endswith("/"):
         path = path.rstrip("/")
 
     # Sort and filter query params
-    query_params = parse_qs(parsed.query, keep_blank_values=True)
-    filtered_params = {
-        k: v for k, v in sorted(query_params.items())
-        if k.lower() not in _TRACKING_PARAMS
-    }
-    query = urlencode(filtered_params, doseq=True) if filtered_params else ""
+    query = _filter_query(query)
 
     # Remove fragment
     normalized = urlunparse((scheme, netloc, path, "", query, ""))
@@ -81,17 +176,20 @@ def deduplicate_urls(urls: list[str]) -> list[str]:
 
     Returns the first occurrence of each normalized URL.
     """
+    stripped = [url for url in map(str.strip, urls) if url]
     seen: dict[str, str] = {}  # normalized -> original
-    for url in urls:
-        url = url.strip()
-        if not url:
-            continue
-        norm = normalize_url(url)
-        if norm not in seen:
-            seen[norm] = url
+    for norm, url in zip(map(normalize_url, stripped), stripped):
+        seen.setdefault(norm, url)
     return list(seen.values())
 
 
+async def deduplicate_urls_async(urls: list[str]) -> list[str]:
+    """deduplicate_urls that normalizes large lists in a worker thread."""
+    if len(urls) > DEDUP_OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(deduplicate_urls, urls)
+    return deduplicate_urls(urls)
+
+
 async def check_redis_seen(redis, job_id: str, url: str) -> bool:
     """Check if a URL has been seen for a given job using Redis SET.
 
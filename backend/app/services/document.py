@@ -1,13 +1,18 @@
 """Document extraction service for PDF, DOCX, and other non-HTML formats."""
 
+import asyncio
 import io
 import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentResult:
     """Extracted document content."""
     text: str = ""
@@ -17,56 +22,115 @@ class DocumentResult:
     word_count: int = 0
 
 
+# Parsing is CPU-bound, so documents are extracted in worker processes
+DOCUMENT_POOL_WORKERS = min(4, os.cpu_count() or 1)
+
+_pool: ProcessPoolExecutor | None = None
+# Set once processes turn out to be unusable here; extraction then stays on threads
+_pool_disabled = False
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    global _pool, _pool_disabled
+    if _pool is None and not _pool_disabled:
+        if multiprocessing.current_process().daemon:
+            # Celery prefork workers are daemonic and may not have children
+            _pool_disabled = True
+        else:
+            _pool = ProcessPoolExecutor(max_workers=DOCUMENT_POOL_WORKERS)
+    return _pool
+
+
+def _disable_pool():
+    """Tear the pool down for good, dropping any work items it still holds."""
+    global _pool, _pool_disabled
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+    _pool_disabled = True
+
+
+async def _run_in_pool(func, raw_bytes: bytes) -> DocumentResult:
+    """Run a sync extractor in the process pool, or a thread if the pool is unusable."""
+    pool = _get_pool()
+    if pool is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, func, raw_bytes)
+        except Exception as e:
+            # Extractors catch their own errors, so this is the pool itself failing
+            # (e.g. a worker died, or processes cannot be spawned here)
+            logger.warning(f"Document process pool unavailable, using threads from now on: {e}")
+            _disable_pool()
+    return await asyncio.to_thread(func, raw_bytes)
+
+
+_URL_EXTENSIONS = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".xlsx": "xlsx",
+    ".doc": "docx",  # Will attempt docx parsing
+}
+
+_CONTENT_TYPES = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml": "docx",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml": "xlsx",
+    "application/msword": "docx",
+    "text/html": "html",
+    "application/xhtml": "html",
+}
+_CONTENT_TYPE_RE = re.compile("|".join(re.escape(ct) for ct in _CONTENT_TYPES))
+
+_MAGIC_BYTES = {
+    b"%PDF": "pdf",
+    # ZIP-based format (docx, xlsx, etc.). URLs ending in .xlsx were already
+    # caught by the extension check, so default to docx.
+    b"PK\x03\x04": "docx",
+}
+
+
 def detect_document_type(
     url: str,
     content_type: str | None = None,
-    raw_bytes: bytes = b"",
+    raw_bytes: bytes | bytearray | memoryview = b"",
 ) -> str:
     """Detect document type from URL extension and content-type header.
 
+    Only the first four bytes of raw_bytes are read, so callers can pass a
+    memoryview or buffer without copying the body.
+
     Returns: "html", "pdf", "docx", "xlsx", or "unknown"
     """
     url_lower = url.lower().split("?")[0].split("#")[0]
 
     # Check URL extension first
-    if url_lower.endswith(".pdf"):
-        return "pdf"
-    if url_lower.endswith(".docx"):
-        return "docx"
-    if url_lower.endswith(".xlsx"):
-        return "xlsx"
-    if url_lower.endswith(".doc"):
-        return "docx"  # Will attempt docx parsing
+    dot = url_lower.rfind(".")
+    if dot >= 0:
+        doc_type = _URL_EXTENSIONS.get(url_lower[dot:])
+        if doc_type:
+            return doc_type
 
     # Check content-type header
     if content_type:
-        ct = content_type.lower()
-        if "application/pdf" in ct:
-            return "pdf"
-        if "application/vnd.openxmlformats-officedocument.wordprocessingml" in ct:
-            return "docx"
-        if "application/vnd.openxmlformats-officedocument.spreadsheetml" in ct:
-            return "xlsx"
-        if "application/msword" in ct:
-            return "docx"
-        if "text/html" in ct or "application/xhtml" in ct:
-            return "html"
+        match = _CONTENT_TYPE_RE.search(content_type.lower())
+        if match:
+            return _CONTENT_TYPES[match.group()]
 
     # Check magic bytes
     if raw_bytes:
-        if raw_bytes[:4] == b"%PDF":
-            return "pdf"
-        if raw_bytes[:4] == b"PK\x03\x04":
-            # ZIP-based format (docx, xlsx, etc.)
-            if url_lower.endswith(".xlsx"):
-                return "xlsx"
-            return "docx"  # Default to docx for ZIP-based
+        doc_type = _MAGIC_BYTES.get(bytes(raw_bytes[:4]))
+        if doc_type:
+            return doc_type
 
     return "html"  # Default to HTML
 
 
 async def extract_pdf(raw_bytes: bytes) -> DocumentResult:
     """Extract text and metadata from a PDF using PyMuPDF (fitz)."""
+    return await _run_in_pool(_extract_pdf_sync, raw_bytes)
+
+
+def _extract_pdf_sync(raw_bytes: bytes) -> DocumentResult:
     try:
         import fitz  # PyMuPDF
     except ImportError:
@@ -102,16 +166,26 @@ async def extract_pdf(raw_bytes: bytes) -> DocumentResult:
                 for level, title, page in toc
             ]
 
-        # Extract text from all pages
-        pages_text = []
+        # Extract text from all pages, writing the plain text and the
+        # markdown page sections in the same pass
+        text_buf = io.StringIO()
+        pages_md = io.StringIO()
+        word_count = 0
+        pages_written = 0
         for page_num in range(doc.page_count):
             page = doc[page_num]
             text = page.get_text("text")
-            if text.strip():
-                pages_text.append(text)
+            stripped = text.strip()
+            if not stripped:
+                continue
+            if pages_written:
+                text_buf.write("\n\n")
+            text_buf.write(text)
+            word_count += len(text.split())
+            pages_written += 1
+            pages_md.write(f"\n\n## Page {pages_written}\n\n\n{stripped}\n\n")
 
-        full_text = "\n\n".join(pages_text)
-        word_count = len(full_text.split())
+        full_text = text_buf.getvalue()
 
         # Build markdown output
         md_parts = []
@@ -122,12 +196,7 @@ async def extract_pdf(raw_bytes: bytes) -> DocumentResult:
         md_parts.append(f"**Pages:** {doc.page_count} | **Words:** {word_count}\n")
         md_parts.append("---\n")
 
-        for i, page_text in enumerate(pages_text):
-            md_parts.append(f"## Page {i + 1}\n")
-            md_parts.append(page_text.strip())
-            md_parts.append("")
-
-        markdown = "\n\n".join(md_parts)
+        markdown = "\n\n".join(md_parts) + pages_md.getvalue()
 
         doc.close()
 
@@ -135,7 +204,7 @@ async def extract_pdf(raw_bytes: bytes) -> DocumentResult:
             text=full_text,
             markdown=markdown,
             metadata=metadata,
-            page_count=doc.page_count,
+            page_count=metadata["page_count"],
             word_count=word_count,
         )
 
@@ -150,6 +219,10 @@ async def extract_pdf(raw_bytes: bytes) -> DocumentResult:
 
 async def extract_docx(raw_bytes: bytes) -> DocumentResult:
     """Extract text and metadata from a DOCX using python-docx."""
+    return await _run_in_pool(_extract_docx_sync, raw_bytes)
+
+
+def _extract_docx_sync(raw_bytes: bytes) -> DocumentResult:
     try:
         from docx import Document
     except ImportError:
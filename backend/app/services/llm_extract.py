@@ -1,8 +1,10 @@
 import json
 import logging
+import re
 from typing import Any
 from uuid import UUID
 
+import orjson
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -36,6 +38,32 @@ DEFAULT_MODELS = {
 }
 
 
+# Prompt size limits (roughly what fits the smaller providers' context windows)
+MAX_PROMPT_WORDS = 8000
+MAX_PROMPT_CHARS = 80_000
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def _truncate_prompt(text: str) -> str:
+    """Clip text to MAX_PROMPT_CHARS, then to its first MAX_PROMPT_WORDS words.
+
+    Only the kept prefix is scanned, so huge inputs are never split in full.
+    """
+    truncated = len(text) > MAX_PROMPT_CHARS
+    if truncated:
+        text = text[:MAX_PROMPT_CHARS]
+    for count, match in enumerate(_WORD_RE.finditer(text), 1):
+        if count == MAX_PROMPT_WORDS:
+            if _WORD_RE.search(text, match.end()):
+                text = text[:match.end()]
+                truncated = True
+            break
+    if truncated:
+        text += "\n\n[Content truncated...]"
+    return text
+
+
 async def extract_with_llm(
     db: AsyncSession,
     user_id: UUID,
@@ -77,10 +105,8 @@ async def extract_with_llm(
         user_prompt = f"Instruction: {prompt}\n\n"
     user_prompt += f"Content to extract from:\n\n{content}"
 
-    # Truncate content to avoid token limits (keep ~8000 words)
-    words = user_prompt.split()
-    if len(words) > 8000:
-        user_prompt = " ".join(words[:8000]) + "\n\n[Content truncated...]"
+    # Truncate content to avoid token limits
+    user_prompt = _truncate_prompt(user_prompt)
 
     try:
         response = await litellm.acompletion(
@@ -99,14 +125,14 @@ async def extract_with_llm(
 
         # Try to parse as JSON
         try:
-            return json.loads(result_text)
-        except json.JSONDecodeError:
+            return orjson.loads(result_text)
+        except orjson.JSONDecodeError:
             # Try to extract JSON from markdown code blocks
             if "```" in result_text:
                 json_match = result_text.split("```")[1]
                 if json_match.startswith("json"):
                     json_match = json_match[4:]
-                return json.loads(json_match.strip())
+                return orjson.loads(json_match.strip())
             return {"raw_response": result_text}
 
     except Exception as e:
@@ -118,26 +144,14 @@ async def _get_user_llm_key(
     db: AsyncSession, user_id: UUID, provider: str | None = None
 ) -> LLMKey | None:
     """Get the user's LLM key, preferring the specified provider or default."""
+    # Provider match first, then the default key, then any key
+    ordering = [LLMKey.is_default.desc()]
     if provider:
-        result = await db.execute(
-            select(LLMKey).where(
-                LLMKey.user_id == user_id, LLMKey.provider == provider
-            )
-        )
-        key = result.scalar_one_or_none()
-        if key:
-            return key
-
-    # Try default key
-    result = await db.execute(
-        select(LLMKey).where(LLMKey.user_id == user_id, LLMKey.is_default == True)
-    )
-    key = result.scalar_one_or_none()
-    if key:
-        return key
-
-    # Try any key
+        ordering.insert(0, (LLMKey.provider == provider).desc())
     result = await db.execute(
-        select(LLMKey).where(LLMKey.user_id == user_id).limit(1)
+        select(LLMKey)
+        .where(LLMKey.user_id == user_id)
+        .order_by(*ordering)
+        .limit(1)
     )
     return result.scalar_one_or_none()
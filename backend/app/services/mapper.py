@@ -1,17 +1,52 @@
+import asyncio
 import gzip
 import io
+import itertools
 import logging
 import random
-import xml.etree.ElementTree as ET
-from urllib.parse import urljoin, urlparse
+import re
+from typing import BinaryIO
+from urllib.parse import urljoin, urlparse, urlsplit
 
 import httpx
-from bs4 import BeautifulSoup
+from lxml import etree
 
 from app.schemas.map import MapRequest, LinkResult
 
 logger = logging.getLogger(__name__)
 
+# Sitemap indexes can list hundreds of children; fetch them in parallel
+# but cap how many requests hit the same site at once.
+SITEMAP_FETCH_CONCURRENCY = 16
+MAX_SUB_SITEMAPS = 200
+
+# BeautifulSoup's get_text() only returns strings of the element's own kind:
+# text under script/style/template/rt/rp belongs to that tag, not to the page.
+_STRING_CONTAINERS = ("script", "style", "template", "rt", "rp")
+_CONTAINER_TEST = " or ".join(f"self::{tag}" for tag in _STRING_CONTAINERS)
+_VISIBLE_TEXT = etree.XPath(f".//text()[not(ancestor::*[{_CONTAINER_TEST}])]")
+_CONTAINER_TEXT = {
+    tag: etree.XPath(f".//text()[ancestor::*[{_CONTAINER_TEST}][1][self::{tag}]]")
+    for tag in _STRING_CONTAINERS
+}
+
+_SITEMAP_NS = {
+    "sm": "http://www.sitemaps.org/schemas/sitemap/0.9",
+    "image": "http://www.google.com/schemas/sitemap-image/1.1",
+}
+_SM_URL = f"{{{_SITEMAP_NS['sm']}}}url"
+_SM_SITEMAP = f"{{{_SITEMAP_NS['sm']}}}sitemap"
+_SM_LOC = f"{{{_SITEMAP_NS['sm']}}}loc"
+_SM_LASTMOD = f"{{{_SITEMAP_NS['sm']}}}lastmod"
+_SM_PRIORITY = f"{{{_SITEMAP_NS['sm']}}}priority"
+_SM_CHANGEFREQ = f"{{{_SITEMAP_NS['sm']}}}changefreq"
+_IMAGE_IMAGE = f"{{{_SITEMAP_NS['image']}}}image"
+_IMAGE_LOC = f"{{{_SITEMAP_NS['image']}}}loc"
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# hrefs that can never resolve to an http(s) page
+_SKIP_HREF = re.compile(r"(?:#|mailto:|tel:|javascript:|data:|blob:|ftp:|wss?:)", re.IGNORECASE)
+
 # Rotating headers for HTTP requests
 _HEADERS_LIST = [
     {
@@ -29,77 +64,112 @@ _HEADERS_LIST = [
 ]
 
 
-async def _fetch_url(url: str, timeout: int = 15) -> tuple[str, int]:
-    """Fetch a URL using curl_cffi (TLS impersonation) with httpx fallback."""
+_IMPERSONATE_TARGETS = ["chrome124", "chrome123", "chrome120"]
+
+# Rotate fingerprints and headers in turn; next() on a cycle is cheaper than
+# random.choice() and spreads requests evenly across the variants
+_HEADER_ROTATION = itertools.cycle(_HEADERS_LIST)
+_IMPERSONATE_ROTATION = itertools.cycle(_IMPERSONATE_TARGETS)
+
+# Shared HTTP clients so connections and TLS sessions are reused across
+# fetches. Both are bound to the event loop they were created on, and
+# workers run each task on a fresh loop, so they are rebuilt on loop change.
+_session = None
+_client: httpx.AsyncClient | None = None
+_clients_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_clients():
+    """Return the (curl_cffi session, httpx client) pair for the running loop."""
+    global _session, _client, _clients_loop
+    loop = asyncio.get_running_loop()
+    if _clients_loop is not loop:
+        try:
+            from curl_cffi.requests import AsyncSession
+            _session = AsyncSession(impersonate=_IMPERSONATE_TARGETS[0])
+        except Exception as e:
+            logger.debug(f"curl_cffi session unavailable: {e}")
+            _session = None
+        # HTTP/2 is kept: concurrent sub-sitemap fetches to one host share
+        # a single multiplexed connection
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            http2=True,
+            timeout=15,
+            limits=httpx.Limits(max_connections=256, max_keepalive_connections=64),
+        )
+        _clients_loop = loop
+    return _session, _client
+
+
+async def close_http_clients():
+    """Close the shared HTTP clients; call before the owning event loop exits."""
+    global _session, _client, _clients_loop
+    session, client = _session, _client
+    _session = _client = _clients_loop = None
+    if session is not None:
+        try:
+            await session.close()
+        except Exception:
+            pass
+    if client is not None:
+        await client.aclose()
+
+
+async def _get(url: str, timeout: int):
+    """Fetch a URL using curl_cffi (TLS impersonation) with httpx fallback.
+
+    Returns the response, or None if both clients fail.
+    """
+    session, client = _get_clients()
+
     # Try curl_cffi first
-    try:
-        from curl_cffi.requests import AsyncSession
-        impersonate = random.choice(["chrome124", "chrome123", "chrome120"])
-        async with AsyncSession(impersonate=impersonate) as session:
+    if session is not None:
+        try:
             resp = await session.get(
                 url,
+                impersonate=next(_IMPERSONATE_ROTATION),
                 timeout=timeout,
                 allow_redirects=True,
-                headers=random.choice(_HEADERS_LIST),
+                headers=next(_HEADER_ROTATION),
             )
-            logger.debug(f"curl_cffi {url} -> {resp.status_code} ({len(resp.text)} chars)")
-            return resp.text, resp.status_code
-    except Exception as e:
-        logger.debug(f"curl_cffi failed for {url}: {e}")
+            logger.debug(f"curl_cffi {url} -> {resp.status_code} ({len(resp.content)} bytes)")
+            return resp
+        except Exception as e:
+            logger.debug(f"curl_cffi failed for {url}: {e}")
 
     # Fallback to httpx
     try:
-        async with httpx.AsyncClient(
-            timeout=timeout,
-            follow_redirects=True,
-            headers=random.choice(_HEADERS_LIST),
-            http2=True,
-        ) as client:
-            resp = await client.get(url)
-            logger.debug(f"httpx {url} -> {resp.status_code} ({len(resp.text)} chars)")
-            return resp.text, resp.status_code
+        resp = await client.get(url, timeout=timeout, headers=next(_HEADER_ROTATION))
+        logger.debug(f"httpx {url} -> {resp.status_code} ({len(resp.content)} bytes)")
+        return resp
     except Exception as e:
         logger.debug(f"httpx failed for {url}: {e}")
 
-    return "", 0
+    return None
 
 
-async def _fetch_bytes(url: str, timeout: int = 15) -> tuple[bytes, int]:
-    """Fetch a URL and return raw bytes (for gzip handling)."""
-    try:
-        from curl_cffi.requests import AsyncSession
-        impersonate = random.choice(["chrome124", "chrome123", "chrome120"])
-        async with AsyncSession(impersonate=impersonate) as session:
-            resp = await session.get(
-                url,
-                timeout=timeout,
-                allow_redirects=True,
-                headers=random.choice(_HEADERS_LIST),
-            )
-            return resp.content, resp.status_code
-    except Exception:
-        pass
+async def _fetch_url(url: str, timeout: int = 15) -> tuple[str, int]:
+    """Fetch a URL and return decoded text."""
+    resp = await _get(url, timeout)
+    if resp is None:
+        return "", 0
+    return resp.text, resp.status_code
 
-    try:
-        async with httpx.AsyncClient(
-            timeout=timeout,
-            follow_redirects=True,
-            headers=random.choice(_HEADERS_LIST),
-            http2=True,
-        ) as client:
-            resp = await client.get(url)
-            return resp.content, resp.status_code
-    except Exception:
-        pass
 
-    return b"", 0
+async def _fetch_bytes(url: str, timeout: int = 15) -> tuple[bytes, int]:
+    """Fetch a URL and return raw bytes (for gzip handling)."""
+    resp = await _get(url, timeout)
+    if resp is None:
+        return b"", 0
+    return resp.content, resp.status_code
 
 
 async def _fetch_with_browser(url: str) -> str:
     """Fetch page content using browser for sites that block HTTP requests."""
     try:
         from app.services.browser import browser_pool
-        async with browser_pool.get_page(target_url=url) as page:
+        async with browser_pool.get_page(use_firefox=None, target_url=url) as page:
             referrer = "https://www.google.com/"
             await page.goto(url, wait_until="domcontentloaded", timeout=45000, referer=referrer)
             # Wait for network to settle but don't block forever
@@ -123,50 +193,51 @@ async def map_website(request: MapRequest) -> list[LinkResult]:
     4. Optional search/keyword filtering
     """
     url = request.url
-    all_links: dict[str, LinkResult] = {}
-
-    # Strategy 1: Sitemap discovery
-    if request.use_sitemap:
-        sitemap_links = await _parse_sitemaps(url)
-        for link in sitemap_links:
-            all_links[link.url] = link
-
-    # Strategy 2: Quick homepage crawl with anti-detection
-    homepage_links = await _crawl_homepage(url, request.include_subdomains)
-    for link in homepage_links:
-        if link.url not in all_links:
-            all_links[link.url] = link
+    # URLs already collected; every strategy skips these before building a
+    # LinkResult, so each URL is kept from the first source that found it
+    seen: set[str] = set()
+
+    # Strategies 1 and 2 are independent, so fetch them concurrently:
+    # 1. Sitemap discovery
+    # 2. Quick homepage crawl with anti-detection
+    # The homepage gets its own seen set; where both find a URL the sitemap
+    # entry, which carries lastmod/priority, is kept.
+    homepage_seen: set[str] = set()
+    sitemap_links, homepage_links = await asyncio.gather(
+        _parse_sitemaps(url, seen) if request.use_sitemap else asyncio.sleep(0, result=[]),
+        _crawl_homepage(url, request.include_subdomains, homepage_seen),
+    )
+    all_links: list[LinkResult] = sitemap_links
+    all_links.extend(link for link in homepage_links if link.url not in seen)
+    seen |= homepage_seen
 
     # Strategy 3: If we got very few links, try browser fallback
     if len(all_links) < 5:
         logger.info(f"Few links found for {url}, trying browser fallback")
-        browser_links = await _crawl_homepage_browser(url, request.include_subdomains)
-        for link in browser_links:
-            if link.url not in all_links:
-                all_links[link.url] = link
+        all_links.extend(await _crawl_homepage_browser(url, request.include_subdomains, seen))
 
     # Strategy 4: Filter by search term
     if request.search:
         search_lower = request.search.lower()
-        filtered = {}
-        for url_key, link in all_links.items():
+        filtered = []
+        for link in all_links:
             score = 0
-            if search_lower in url_key.lower():
+            if search_lower in link.url.lower():
                 score += 2
             if link.title and search_lower in link.title.lower():
                 score += 3
             if link.description and search_lower in link.description.lower():
                 score += 1
             if score > 0:
-                filtered[url_key] = link
+                filtered.append(link)
         all_links = filtered
 
     # Apply limit
-    result = list(all_links.values())[: request.limit]
+    result = all_links[: request.limit]
     return result
 
 
-async def _parse_sitemaps(base_url: str) -> list[LinkResult]:
+async def _parse_sitemaps(base_url: str, seen: set[str]) -> list[LinkResult]:
     """Parse sitemap.xml and sitemap index files with full spec compliance."""
     links = []
     parsed = urlparse(base_url)
@@ -191,121 +262,156 @@ async def _parse_sitemaps(base_url: str) -> list[LinkResult]:
     except Exception:
         pass
 
-    for sitemap_url in sitemap_urls:
-        try:
-            # Fetch sitemap content (handle gzip)
-            xml_text = await _fetch_sitemap_content(sitemap_url)
-            if not xml_text:
-                continue
-
-            # Use iterparse for streaming XML (memory efficient for large sitemaps)
-            root = ET.fromstring(xml_text)
-            ns = {
-                "sm": "http://www.sitemaps.org/schemas/sitemap/0.9",
-                "image": "http://www.google.com/schemas/sitemap-image/1.1",
-            }
-
-            # Check if it's a sitemap index
-            sitemap_index_entries = root.findall(".//sm:sitemap/sm:loc", ns)
-            if sitemap_index_entries:
-                # Process up to 200 sub-sitemaps
-                for entry in sitemap_index_entries[:200]:
-                    if entry.text:
-                        sub_xml = await _fetch_sitemap_content(entry.text.strip())
-                        if sub_xml:
-                            try:
-                                sub_root = ET.fromstring(sub_xml)
-                                sub_links = _parse_single_sitemap_xml(sub_root, ns)
-                                links.extend(sub_links)
-                            except Exception:
-                                pass
-            else:
-                # Regular sitemap
-                sub_links = _parse_single_sitemap_xml(root, ns)
-                links.extend(sub_links)
+    semaphore = asyncio.Semaphore(SITEMAP_FETCH_CONCURRENCY)
 
-        except Exception as e:
-            logger.debug(f"Failed to parse sitemap {sitemap_url}: {e}")
-
-    return links
+    async def fetch(url: str) -> BinaryIO | None:
+        async with semaphore:
+            return await _fetch_sitemap_content(url)
 
+    # Fetch every candidate location at once, then parse in order so that
+    # which copy of a duplicated URL is kept does not depend on timing.
+    # Parsing runs in a worker thread (lxml releases the GIL) so a large
+    # sitemap does not stall fetches still in flight on the event loop
+    sources = await asyncio.gather(*(fetch(u) for u in sitemap_urls), return_exceptions=True)
+    fetched = set(sitemap_urls)
+    for sitemap_url, source in zip(sitemap_urls, sources):
+        if source is None or isinstance(source, BaseException):
+            continue
 
-async def _fetch_sitemap_content(url: str) -> str | None:
-    """Fetch sitemap content, handling gzipped .xml.gz files."""
-    if url.endswith(".gz"):
-        # Fetch as bytes and decompress
-        raw_bytes, status = await _fetch_bytes(url, timeout=20)
-        if status != 200 or not raw_bytes:
-            return None
-        try:
-            decompressed = gzip.decompress(raw_bytes)
-            return decompressed.decode("utf-8", errors="replace")
-        except Exception as e:
-            logger.debug(f"Failed to decompress gzipped sitemap {url}: {e}")
-            return None
-    else:
-        text, status = await _fetch_url(url, timeout=15)
-        if status != 200 or not text:
-            return None
-        return text
+        sub_sitemaps, sitemap_links = await asyncio.to_thread(_parse_sitemap_xml, source, seen)
+        links.extend(sitemap_links)
+        if not sub_sitemaps:
+            continue
 
+        # Sitemap index: fetch up to MAX_SUB_SITEMAPS sub-sitemaps concurrently,
+        # skipping ones another index (e.g. sitemap.xml vs sitemap_index.xml) listed
+        sub_urls = [u for u in dict.fromkeys(sub_sitemaps[:MAX_SUB_SITEMAPS]) if u not in fetched]
+        fetched.update(sub_urls)
+        sub_sources = await asyncio.gather(*(fetch(u) for u in sub_urls), return_exceptions=True)
+        for sub_source in sub_sources:
+            if sub_source is not None and not isinstance(sub_source, BaseException):
+                _, sub_links = await asyncio.to_thread(_parse_sitemap_xml, sub_source, seen)
+                links.extend(sub_links)
 
-def _parse_single_sitemap_xml(root: ET.Element, ns: dict) -> list[LinkResult]:
-    """Extract URLs from a sitemap XML element with lastmod, priority, and image support."""
-    links = []
-    for url_el in root.findall(".//sm:url", ns):
-        loc = url_el.find("sm:loc", ns)
-        if loc is None or not loc.text:
-            continue
+    return links
 
-        url = loc.text.strip()
 
-        # Parse optional fields
-        lastmod_el = url_el.find("sm:lastmod", ns)
-        lastmod = lastmod_el.text.strip() if lastmod_el is not None and lastmod_el.text else None
+async def _fetch_sitemap_content(url: str) -> BinaryIO | None:
+    """Fetch sitemap XML as a readable stream, handling gzipped .xml.gz files.
 
-        priority_el = url_el.find("sm:priority", ns)
-        priority = None
-        if priority_el is not None and priority_el.text:
-            try:
-                priority = float(priority_el.text.strip())
-            except ValueError:
-                pass
+    Gzipped bodies are decompressed lazily as the parser reads, so the
+    uncompressed document is never held in memory as a whole.
+    """
+    raw_bytes, status = await _fetch_bytes(url, timeout=20 if url.endswith(".gz") else 15)
+    if status != 200 or not raw_bytes:
+        return None
+    stream = io.BytesIO(raw_bytes)
+    # Servers often send .gz sitemaps with Content-Encoding: gzip, which the
+    # client has already undone; only wrap bodies that are still compressed
+    if url.endswith(".gz") and raw_bytes[:2] == _GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def _parse_sitemap_xml(source: BinaryIO, seen: set[str]) -> tuple[list[str], list[LinkResult]]:
+    """Stream a sitemap or sitemap index.
+
+    Returns (sub-sitemap URLs, page links not already in seen). Each
+    <url>/<sitemap> entry is discarded once read, so memory stays flat on
+    very large sitemaps. A malformed or truncated document yields the
+    entries read before the error.
+    """
+    sub_sitemaps = []
+    links = []
+    entries = etree.iterparse(
+        source,
+        events=("end",),
+        tag=(_SM_URL, _SM_SITEMAP),
+        resolve_entities=False,
+        no_network=True,
+    )
+    try:
+        for _, elem in entries:
+            if elem.tag == _SM_URL:
+                link = _parse_sitemap_url(elem, seen)
+                if link:
+                    links.append(link)
+            else:
+                sub_sitemaps.extend(
+                    loc.text.strip() for loc in elem.iterchildren(_SM_LOC) if loc.text
+                )
+            # Entries are fully handled; drop them and their earlier siblings
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+    except Exception as e:
+        # URLs read so far are already in seen, so keep their links
+        logger.debug(f"Sitemap parse stopped after {len(links)} links: {e}")
+    return sub_sitemaps, links
+
+
+def _parse_sitemap_url(url_el: etree._Element, seen: set[str]) -> LinkResult | None:
+    """Build a LinkResult from a <url> entry with lastmod, priority, and image support."""
+    # Single pass over the children; first occurrence of each field wins
+    fields = {}
+    image_urls = []
+    for child in url_el.iterchildren(_SM_LOC, _SM_LASTMOD, _SM_PRIORITY, _SM_CHANGEFREQ, _IMAGE_IMAGE):
+        if child.tag == _IMAGE_IMAGE:
+            image_urls.extend(
+                img.text.strip() for img in child.iterchildren(_IMAGE_LOC) if img.text
+            )
+        elif child.tag not in fields:
+            fields[child.tag] = child.text
 
-        changefreq_el = url_el.find("sm:changefreq", ns)
-        changefreq = changefreq_el.text.strip() if changefreq_el is not None and changefreq_el.text else None
-
-        # Parse image sitemap entries
-        image_urls = []
-        for img_el in url_el.findall("image:image/image:loc", ns):
-            if img_el.text:
-                image_urls.append(img_el.text.strip())
-
-        # Build description from metadata
-        desc_parts = []
-        if lastmod:
-            desc_parts.append(f"Updated: {lastmod}")
-        if changefreq:
-            desc_parts.append(f"Freq: {changefreq}")
-        if priority is not None:
-            desc_parts.append(f"Priority: {priority}")
-        if image_urls:
-            desc_parts.append(f"{len(image_urls)} image(s)")
-
-        description = " | ".join(desc_parts) if desc_parts else None
-
-        links.append(LinkResult(
-            url=url,
-            title=None,
-            description=description,
-            lastmod=lastmod,
-            priority=priority,
-        ))
+    loc = fields.get(_SM_LOC)
+    if not loc:
+        return None
 
-    return links
+    url = loc.strip()
+    if url in seen:
+        return None
+    seen.add(url)
 
+    # Parse optional fields
+    lastmod = fields.get(_SM_LASTMOD)
+    lastmod = lastmod.strip() if lastmod else None
 
-async def _crawl_homepage(base_url: str, include_subdomains: bool) -> list[LinkResult]:
+    priority_text = fields.get(_SM_PRIORITY)
+    priority = None
+    if priority_text:
+        try:
+            priority = float(priority_text.strip())
+        except ValueError:
+            pass
+
+    changefreq = fields.get(_SM_CHANGEFREQ)
+    changefreq = changefreq.strip() if changefreq else None
+
+    # Build description from metadata
+    desc_parts = []
+    if lastmod:
+        desc_parts.append(f"Updated: {lastmod}")
+    if changefreq:
+        desc_parts.append(f"Freq: {changefreq}")
+    if priority is not None:
+        desc_parts.append(f"Priority: {priority}")
+    if image_urls:
+        desc_parts.append(f"{len(image_urls)} image(s)")
+
+    description = " | ".join(desc_parts) if desc_parts else None
+
+    return LinkResult(
+        url=url,
+        title=None,
+        description=description,
+        lastmod=lastmod,
+        priority=priority,
+    )
+
+
+async def _crawl_homepage(base_url: str, include_subdomains: bool, seen: set[str]) -> list[LinkResult]:
     """Quick crawl of homepage using curl_cffi for anti-detection."""
     links = []
     parsed_base = urlparse(base_url)
@@ -320,7 +426,9 @@ async def _crawl_homepage(base_url: str, include_subdomains: bool) -> list[LinkR
         if not text:
             return links
 
-        links = _extract_links_from_html(text, base_url, base_domain, include_subdomains)
+        links = await asyncio.to_thread(
+            _extract_links_from_html, text, base_url, base_domain, include_subdomains, seen
+        )
         logger.info(f"Homepage crawl for {base_url}: status={status}, links={len(links)}")
 
     except Exception as e:
@@ -329,7 +437,7 @@ async def _crawl_homepage(base_url: str, include_subdomains: bool) -> list[LinkR
     return links
 
 
-async def _crawl_homepage_browser(base_url: str, include_subdomains: bool) -> list[LinkResult]:
+async def _crawl_homepage_browser(base_url: str, include_subdomains: bool, seen: set[str]) -> list[LinkResult]:
     """Crawl homepage using browser for sites that block HTTP requests."""
     parsed_base = urlparse(base_url)
     base_domain = parsed_base.netloc
@@ -339,30 +447,68 @@ async def _crawl_homepage_browser(base_url: str, include_subdomains: bool) -> li
         if not html:
             return []
 
-        return _extract_links_from_html(html, base_url, base_domain, include_subdomains)
+        return await asyncio.to_thread(
+            _extract_links_from_html, html, base_url, base_domain, include_subdomains, seen
+        )
 
     except Exception as e:
         logger.warning(f"Browser homepage crawl failed for {base_url}: {e}")
         return []
 
 
+def _visible_text(el) -> str:
+    """Equivalent of BeautifulSoup's get_text(strip=True) for an lxml element."""
+    xpath = _CONTAINER_TEXT.get(el.tag, _VISIBLE_TEXT)
+    return "".join(text.strip() for text in xpath(el))
+
+
 def _extract_links_from_html(
-    html: str, base_url: str, base_domain: str, include_subdomains: bool
+    html: str, base_url: str, base_domain: str, include_subdomains: bool, seen: set[str]
 ) -> list[LinkResult]:
-    """Extract all links from HTML content."""
+    """Extract links from HTML content, skipping (and recording) URLs in seen."""
     links = []
-    soup = BeautifulSoup(html, "lxml")
-
-    # Get page title and description for context
-    page_title = soup.title.get_text(strip=True) if soup.title else None
-
-    for a_tag in soup.find_all("a", href=True):
-        href = a_tag["href"].strip()
-        if href.startswith(("#", "mailto:", "tel:", "javascript:")):
+    # The feed interface, like bs4's lxml builder, accepts str input that
+    # still carries an <?xml encoding=...?> declaration
+    parser = etree.HTMLParser()
+    try:
+        parser.feed(html)
+        root = parser.close()
+    except etree.LxmlError:
+        return links
+    if root is None:
+        return links
+
+    # urljoin() returns the href unchanged only when it is empty; normalise
+    # the base the same way so that case needs no special handling below
+    parsed_base = urlparse(base_url)
+    base_url = parsed_base._replace(fragment="").geturl()
+    # Root domain (last two labels) that subdomain links must share
+    base_root = base_domain.split(".")[-2:]
+    if len(base_root) < 2:
+        base_root = None
+    # Raw hrefs already handled on this page (nav/footer links repeat); a
+    # repeat resolves to the same URL, so it was either kept or rejected
+    seen_hrefs: set[str] = set()
+
+    for a_tag in root.iter("a"):
+        href = a_tag.get("href")
+        if href is None:
+            continue
+        href = href.strip()
+        if href in seen_hrefs:
+            continue
+        seen_hrefs.add(href)
+        if _SKIP_HREF.match(href):
             continue
 
-        absolute_url = urljoin(base_url, href)
-        parsed = urlparse(absolute_url)
+        # Absolute links are checked before urljoin(), which for them only
+        # re-serialises the href; external ones never reach it
+        parsed = urlsplit(href) if href.startswith(("http://", "https://")) else None
+        if parsed is not None and parsed.netloc:
+            absolute_url = None
+        else:
+            absolute_url = urljoin(base_url, href)
+            parsed = urlsplit(absolute_url)
 
         # Only http/https
         if parsed.scheme not in ("http", "https"):
@@ -371,26 +517,31 @@ def _extract_links_from_html(
         # Filter by domain
         if not include_subdomains and parsed.netloc != base_domain:
             continue
-        if include_subdomains:
+        if include_subdomains and base_root:
             # Allow subdomains of the same root domain
-            base_parts = base_domain.split(".")
-            parsed_parts = parsed.netloc.split(".")
-            if len(base_parts) >= 2 and len(parsed_parts) >= 2:
-                base_root = ".".join(base_parts[-2:])
-                parsed_root = ".".join(parsed_parts[-2:])
-                if base_root != parsed_root:
-                    continue
+            parsed_root = parsed.netloc.rsplit(".", 2)[-2:]
+            if len(parsed_root) == 2 and parsed_root != base_root:
+                continue
 
-        # Clean URL (remove fragments)
-        clean_url = parsed._replace(fragment="").geturl()
+        # Clean URL (remove fragments). urljoin() output is already in
+        # urlunparse() form, so cutting at the first "#" matches geturl();
+        # only links to the other scheme are passed through untouched
+        if absolute_url is not None and parsed.scheme == parsed_base.scheme:
+            clean_url = absolute_url.split("#", 1)[0]
+        else:
+            clean_url = urlparse(absolute_url or href)._replace(fragment="").geturl()
+        # Skip repeats before the text extraction below, the costly part
+        if clean_url in seen:
+            continue
+        seen.add(clean_url)
 
-        title = a_tag.get_text(strip=True) or None
+        title = _visible_text(a_tag) or None
 
         # Get description from nearby text or parent
         description = None
-        parent = a_tag.parent
-        if parent:
-            sibling_text = parent.get_text(strip=True)
+        parent = a_tag.getparent()
+        if parent is not None:
+            sibling_text = _visible_text(parent)
             if sibling_text and sibling_text != title and len(sibling_text) < 200:
                 description = sibling_text
 
@@ -1,6 +1,9 @@
+import itertools
 import logging
 import random
+from collections.abc import Iterator
 from dataclasses import dataclass
+from functools import lru_cache
 from urllib.parse import urlparse, urlunparse
 from uuid import UUID
 
@@ -10,7 +13,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Frozen: from_url() hands the same cached instance to every caller
+@dataclass(frozen=True)
 class Proxy:
     protocol: str  # http, https, socks5
     host: str
@@ -21,14 +25,20 @@ class Proxy:
     @classmethod
     def from_url(cls, url: str) -> "Proxy":
         """Parse a proxy URL into a Proxy object."""
-        parsed = urlparse(url)
-        return cls(
-            protocol=parsed.scheme or "http",
-            host=parsed.hostname or "",
-            port=parsed.port or 8080,
-            username=parsed.username,
-            password=parsed.password,
-        )
+        return _parse_proxy(url)
+
+
+@lru_cache(maxsize=1024)
+def _parse_proxy(url: str) -> Proxy:
+    """Parse a proxy URL; cached since pools are reloaded for every job."""
+    parsed = urlparse(url)
+    return Proxy(
+        protocol=parsed.scheme or "http",
+        host=parsed.hostname or "",
+        port=parsed.port or 8080,
+        username=parsed.username,
+        password=parsed.password,
+    )
 
 
 class ProxyManager:
@@ -36,6 +46,10 @@ class ProxyManager:
 
     def __init__(self, proxies: list[Proxy] | None = None):
         self._proxies = proxies or []
+        # Round-robin from a random starting order, so every proxy gets an
+        # equal share and separate managers don't all lead with the same one.
+        # next() on itertools.cycle is a single C call, safe without a lock.
+        self._cycle = itertools.cycle(random.sample(self._proxies, len(self._proxies)))
 
     @classmethod
     async def from_user(cls, db: AsyncSession, user_id: UUID) -> "ProxyManager":
@@ -63,11 +77,20 @@ class ProxyManager:
     def has_proxies(self) -> bool:
         return len(self._proxies) > 0
 
-    def get_random(self) -> Proxy | None:
-        """Get a random proxy from the pool."""
+    def get_next(self) -> Proxy | None:
+        """Get the next proxy in rotation."""
         if not self._proxies:
             return None
-        return random.choice(self._proxies)
+        return next(self._cycle)
+
+    def get_random(self) -> Proxy | None:
+        """Get a proxy from the pool; kept for callers of the old name."""
+        return self.get_next()
+
+    def get_shuffled_cycle(self) -> Iterator[Proxy]:
+        """Endless iterator over the pool, reshuffled after each full pass."""
+        while self._proxies:
+            yield from random.sample(self._proxies, len(self._proxies))
 
     @staticmethod
     def to_playwright(proxy: Proxy) -> dict:
@@ -88,6 +111,7 @@ class ProxyManager:
         return f"{proxy.protocol}://{proxy.host}:{proxy.port}"
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def mask_url(url: str) -> str:
         """Mask credentials in a proxy URL for display."""
         parsed = urlparse(url)
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import logging
 import random
@@ -11,15 +12,10 @@ import httpx
 from app.schemas.scrape import ScrapeRequest, ScrapeData, PageMetadata
 from app.services.browser import browser_pool
 from app.services.content import (
-    extract_main_content,
+    extract_main_content_async,
     apply_tag_filters,
     html_to_markdown,
-    extract_links,
-    extract_links_detailed,
-    extract_metadata,
-    extract_structured_data,
-    extract_headings,
-    extract_images,
+    extract_all,
 )
 
 logger = logging.getLogger(__name__)
@@ -201,7 +197,7 @@ async def scrape_url(
     proxy_url = None
     proxy_playwright = None
     if proxy_manager:
-        proxy_obj = proxy_manager.get_random()
+        proxy_obj = proxy_manager.get_next()
         if proxy_obj:
             proxy_url = proxy_manager.to_httpx(proxy_obj)
             proxy_playwright = proxy_manager.to_playwright(proxy_obj)
@@ -314,33 +310,31 @@ async def scrape_url(
     # === Content extraction ===
     result_data: dict[str, Any] = {}
 
-    clean_html = extract_main_content(raw_html, url) if request.only_main_content else raw_html
+    if request.only_main_content:
+        clean_html = await extract_main_content_async(raw_html, url)
+    else:
+        clean_html = raw_html
     if request.include_tags or request.exclude_tags:
         clean_html = apply_tag_filters(clean_html, request.include_tags, request.exclude_tags)
 
     if "markdown" in request.formats:
-        result_data["markdown"] = html_to_markdown(clean_html)
+        # The slowest extraction step on large pages; keep it off the event loop
+        result_data["markdown"] = await asyncio.to_thread(html_to_markdown, clean_html)
     if "html" in request.formats:
         result_data["html"] = clean_html
     if "raw_html" in request.formats:
         result_data["raw_html"] = raw_html
-    if "links" in request.formats:
-        result_data["links"] = extract_links(raw_html, url)
-        result_data["links_detail"] = extract_links_detailed(raw_html, url)
     if "screenshot" in request.formats:
         if screenshot_b64:
             result_data["screenshot"] = screenshot_b64
         elif action_screenshots:
             result_data["screenshot"] = action_screenshots[-1]
-    if "structured_data" in request.formats:
-        result_data["structured_data"] = extract_structured_data(raw_html)
-    if "headings" in request.formats:
-        result_data["headings"] = extract_headings(raw_html)
-    if "images" in request.formats:
-        result_data["images"] = extract_images(raw_html, url)
 
-    metadata_dict = extract_metadata(raw_html, url, status_code, response_headers)
-    metadata = PageMetadata(**metadata_dict)
+    # Links, structured data, headings, images and metadata share one parse
+    result_data.update(
+        extract_all(raw_html, url, request.formats, status_code, response_headers)
+    )
+    metadata = PageMetadata(**result_data["metadata"])
 
     scrape_data = ScrapeData(
         markdown=result_data.get("markdown"),
@@ -383,7 +377,7 @@ async def _handle_document_url(
 
     proxy_url = None
     if proxy_manager:
-        proxy_obj = proxy_manager.get_random()
+        proxy_obj = proxy_manager.get_next()
         if proxy_obj:
             proxy_url = proxy_manager.to_httpx(proxy_obj)
 
@@ -537,7 +531,9 @@ async def _fetch_with_browser_stealth(
     status_code = 0
     response_headers: dict[str, str] = {}
 
-    async with browser_pool.get_page(proxy=proxy, use_firefox=use_firefox) as page:
+    async with browser_pool.get_page(
+        proxy=proxy, use_firefox=use_firefox, isolated=bool(request.actions),
+    ) as page:
         referrer = random.choice(_GOOGLE_REFERRERS)
 
         # Fast navigation: domcontentloaded first (doesn't hang on analytics)
@@ -590,7 +586,7 @@ async def _fetch_with_browser_aggressive(
     status_code = 0
     response_headers: dict[str, str] = {}
 
-    async with browser_pool.get_page(proxy=proxy) as page:
+    async with browser_pool.get_page(proxy=proxy, isolated=bool(request.actions)) as page:
         referrer = random.choice(_GOOGLE_REFERRERS)
 
         # Navigate to target
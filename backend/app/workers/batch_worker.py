@@ -27,7 +27,8 @@ def process_batch(self, job_id: str, config: dict):
         from app.schemas.batch import BatchScrapeRequest
         from app.schemas.scrape import ScrapeRequest
         from app.services.scraper import scrape_url
-        from app.services.dedup import deduplicate_urls
+        from app.services.dedup import deduplicate_urls_async
+        from app.core.serialization import encode_links_detail
 
         session_factory, db_engine = create_worker_session_factory()
         request = BatchScrapeRequest(**config)
@@ -52,7 +53,7 @@ def process_batch(self, job_id: str, config: dict):
                 })
         elif request.urls:
             # Deduplicate URL list
-            deduped = deduplicate_urls(request.urls)
+            deduped = await deduplicate_urls_async(request.urls)
             for url in deduped:
                 url_configs.append({
                     "url": url,
@@ -111,8 +112,6 @@ def process_batch(self, job_id: str, config: dict):
                         metadata["headings"] = result.headings
                     if result.images:
                         metadata["images"] = result.images
-                    if result.links_detail:
-                        metadata["links_detail"] = result.links_detail
 
                     return {
                         "url": url_config["url"],
@@ -121,6 +120,7 @@ def process_batch(self, job_id: str, config: dict):
                         "links": result.links if result.links else None,
                         "screenshot": result.screenshot,
                         "metadata": metadata,
+                        "links_detail_json": encode_links_detail(result.links_detail),
                         "error": None,
                     }
                 except Exception as e:
@@ -132,6 +132,7 @@ def process_batch(self, job_id: str, config: dict):
                         "links": None,
                         "screenshot": None,
                         "metadata": {"error": str(e)},
+                        "links_detail_json": None,
                         "error": str(e),
                     }
 
@@ -149,6 +150,7 @@ def process_batch(self, job_id: str, config: dict):
                         html=r["html"],
                         links=r["links"],
                         metadata_=r["metadata"] if r["metadata"] else None,
+                        links_detail_json=r["links_detail_json"],
                         screenshot_url=r["screenshot"],
                     )
                     db.add(job_result)
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init
 
 from app.config import settings
 
@@ -49,3 +50,11 @@ celery_app.conf.include = [
     "app.workers.search_worker",
     "app.workers.schedule_worker",
 ]
+
+
+@worker_process_init.connect
+def _share_browser_contexts(**kwargs):
+    """Let each worker process reuse pooled browser contexts across pages."""
+    from app.services.browser import browser_pool
+
+    browser_pool.share_contexts = True
@@ -22,6 +22,7 @@ def process_crawl(self, job_id: str, config: dict):
 
     async def _do_crawl():
         from app.core.database import create_worker_session_factory
+        from app.core.serialization import encode_links_detail
         from app.models.job import Job
         from app.models.job_result import JobResult
         from app.schemas.crawl import CrawlRequest
@@ -83,12 +84,7 @@ def process_crawl(self, job_id: str, config: dict):
                 remaining = request.max_pages - pages_crawled
                 batch_size = min(concurrency * 2, remaining)  # Fetch more than concurrency for efficiency
 
-                for _ in range(batch_size):
-                    next_item = await crawler.get_next_url()
-                    if not next_item:
-                        break
-                    url, depth = next_item
-
+                for url, depth in await crawler.get_next_urls(batch_size):
                     # Use normalized URL for dedup check
                     norm_url = normalize_url(url)
                     if await crawler.is_visited(norm_url):
@@ -105,7 +101,7 @@ def process_crawl(self, job_id: str, config: dict):
                 results = await asyncio.gather(*tasks)
 
                 # Collect discovered links from all results, then add to frontier
-                all_discovered = []
+                all_discovered: dict[int, list[str]] = {}
                 for result in results:
                     if result is None:
                         continue
@@ -125,8 +121,6 @@ def process_crawl(self, job_id: str, config: dict):
                         metadata["headings"] = scrape_data.headings
                     if scrape_data.images:
                         metadata["images"] = scrape_data.images
-                    if scrape_data.links_detail:
-                        metadata["links_detail"] = scrape_data.links_detail
 
                     # Store result
                     async with session_factory() as db:
@@ -137,6 +131,7 @@ def process_crawl(self, job_id: str, config: dict):
                             html=scrape_data.html,
                             links=scrape_data.links if scrape_data.links else None,
                             metadata_=metadata if metadata else None,
+                            links_detail_json=encode_links_detail(scrape_data.links_detail),
                             screenshot_url=scrape_data.screenshot,
                         )
                         db.add(job_result)
@@ -151,13 +146,12 @@ def process_crawl(self, job_id: str, config: dict):
                                 cancelled = True
                         await db.commit()
 
-                    # Collect discovered links with depth info
-                    for link in discovered_links:
-                        all_discovered.append((link, depth + 1))
+                    # Collect discovered links grouped by depth
+                    all_discovered.setdefault(depth + 1, []).extend(discovered_links)
 
                 # Add all discovered links to frontier after batch
-                for link, link_depth in all_discovered:
-                    await crawler.add_to_frontier([link], link_depth)
+                for link_depth, links in all_discovered.items():
+                    await crawler.add_to_frontier(links, link_depth)
 
             # Mark job as completed with actual page counts
             async with session_factory() as db:
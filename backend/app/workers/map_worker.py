@@ -26,7 +26,7 @@ def process_map(self, job_id: str, config: dict):
         from app.models.job import Job
         from app.models.job_result import JobResult
         from app.schemas.map import MapRequest
-        from app.services.mapper import map_website
+        from app.services.mapper import close_http_clients, map_website
 
         session_factory, db_engine = create_worker_session_factory()
 
@@ -72,6 +72,7 @@ def process_map(self, job_id: str, config: dict):
                     job.error = str(e)
                 await db.commit()
         finally:
+            await close_http_clients()
             await db_engine.dispose()
 
     _run_async(_do_map())
@@ -26,6 +26,7 @@ def process_scrape(self, job_id: str, url: str, config: dict):
         from app.models.job_result import JobResult
         from app.schemas.scrape import ScrapeRequest
         from app.services.scraper import scrape_url
+        from app.core.serialization import encode_links_detail
 
         from datetime import datetime, timezone
 
@@ -65,8 +66,6 @@ def process_scrape(self, job_id: str, url: str, config: dict):
                     metadata["headings"] = result.headings
                 if result.images:
                     metadata["images"] = result.images
-                if result.links_detail:
-                    metadata["links_detail"] = result.links_detail
 
                 # Store result
                 job_result = JobResult(
@@ -78,6 +77,7 @@ def process_scrape(self, job_id: str, url: str, config: dict):
                     extract=result.extract,
                     screenshot_url=result.screenshot,
                     metadata_=metadata if metadata else None,
+                    links_detail_json=encode_links_detail(result.links_detail),
                 )
                 db.add(job_result)
 
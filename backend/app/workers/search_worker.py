@@ -29,6 +29,7 @@ def process_search(self, job_id: str, config: dict):
         from app.services.search import web_search
         from app.services.scraper import scrape_url
         from app.services.dedup import deduplicate_urls
+        from app.core.serialization import encode_links_detail
 
         session_factory, db_engine = create_worker_session_factory()
         request = SearchRequest(**config)
@@ -119,8 +120,6 @@ def process_search(self, job_id: str, config: dict):
                         metadata["headings"] = result.headings
                     if result.images:
                         metadata["images"] = result.images
-                    if result.links_detail:
-                        metadata["links_detail"] = result.links_detail
 
                     async with session_factory() as db:
                         job_result = JobResult(
@@ -131,6 +130,7 @@ def process_search(self, job_id: str, config: dict):
                             links=result.links if result.links else None,
                             screenshot_url=result.screenshot,
                             metadata_=metadata,
+                            links_detail_json=encode_links_detail(result.links_detail),
                         )
                         db.add(job_result)
 
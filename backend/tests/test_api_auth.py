@@ -35,6 +35,15 @@ class TestRegister:
         })
         assert resp.status_code == 400
 
+    @pytest.mark.asyncio
+    async def test_register_duplicate_email_different_case(self, client: AsyncClient, test_user):
+        """Emails are normalized, so a case/whitespace variant is still a duplicate."""
+        resp = await client.post("/v1/auth/register", json={
+            "email": "  Test@WebHarvest.dev ",
+            "password": "anotherpass",
+        })
+        assert resp.status_code == 400
+
     @pytest.mark.asyncio
     async def test_register_missing_email(self, client: AsyncClient):
         """Missing email field returns 422 (validation error)."""
@@ -80,6 +89,16 @@ class TestLogin:
         })
         assert resp.status_code == 401
 
+    @pytest.mark.asyncio
+    async def test_login_email_case_insensitive(self, client: AsyncClient, test_user):
+        """Login succeeds regardless of the email's case or surrounding whitespace."""
+        resp = await client.post("/v1/auth/login", json={
+            "email": " TEST@webharvest.DEV",
+            "password": "supersecret123",
+        })
+        assert resp.status_code == 200
+        assert "access_token" in resp.json()
+
     @pytest.mark.asyncio
     async def test_login_nonexistent_user(self, client: AsyncClient):
         """Login with an email that doesn't exist returns 401."""
@@ -193,6 +212,14 @@ class TestApiKeyAuth:
         })
         assert resp.status_code == 401
 
+    @pytest.mark.asyncio
+    async def test_revoke_unknown_api_key(self, client: AsyncClient, auth_headers):
+        """Revoking a key that doesn't exist returns 404."""
+        import uuid
+
+        resp = await client.delete(f"/v1/auth/api-keys/{uuid.uuid4()}", headers=auth_headers)
+        assert resp.status_code == 404
+
     @pytest.mark.asyncio
     async def test_invalid_api_key(self, client: AsyncClient):
         """An invalid API key returns 401."""
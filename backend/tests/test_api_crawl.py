@@ -1,5 +1,6 @@
 """Integration tests for /v1/crawl endpoints."""
 
+import json
 import uuid
 from datetime import datetime, timezone
 
@@ -130,6 +131,68 @@ class TestCrawlStatus:
         assert len(data["data"]) == 1
         assert data["data"][0]["url"] == "https://example.com"
 
+    @pytest.mark.asyncio
+    async def test_crawl_status_links_detail_from_stored_json(self, client: AsyncClient, auth_headers, db_session: AsyncSession, test_user):
+        """links_detail stored as pre-serialized bytes is returned verbatim."""
+        job = Job(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            type="crawl",
+            status="completed",
+            config={"url": "https://example.com"},
+            total_pages=1,
+            completed_pages=1,
+        )
+        db_session.add(job)
+        await db_session.flush()
+
+        db_session.add(JobResult(
+            id=uuid.uuid4(),
+            job_id=job.id,
+            url="https://example.com",
+            markdown="# Example",
+            links_detail_json=b'{"internal":{"count":1,"links":[{"url":"https://example.com/a","text":"A"}]}}',
+        ))
+        await db_session.flush()
+
+        resp = await client.get(f"/v1/crawl/{job.id}", headers=auth_headers)
+        assert resp.status_code == 200
+        page = resp.json()["data"][0]
+        assert page["links_detail"]["internal"]["count"] == 1
+        assert page["links_detail"]["internal"]["links"][0]["text"] == "A"
+
+    @pytest.mark.asyncio
+    async def test_crawl_stream_ndjson(self, client: AsyncClient, auth_headers, db_session: AsyncSession, test_user):
+        """GET /v1/crawl/{id}/stream returns one JSON page per line."""
+        job = Job(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            type="crawl",
+            status="completed",
+            config={"url": "https://example.com"},
+            total_pages=2,
+            completed_pages=2,
+        )
+        db_session.add(job)
+        await db_session.flush()
+
+        for path in ("/", "/about"):
+            db_session.add(JobResult(
+                id=uuid.uuid4(),
+                job_id=job.id,
+                url=f"https://example.com{path}",
+                markdown="# Example",
+                links_detail_json=b'{"internal":{"count":0,"links":[]}}',
+            ))
+        await db_session.flush()
+
+        resp = await client.get(f"/v1/crawl/{job.id}/stream", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [p["url"] for p in lines] == ["https://example.com/", "https://example.com/about"]
+        assert lines[0]["links_detail"]["internal"]["count"] == 0
+
     @pytest.mark.asyncio
     async def test_get_crawl_not_found(self, client: AsyncClient, auth_headers):
         """GET /v1/crawl/{id} with a non-existent UUID returns 404."""
@@ -174,3 +237,38 @@ class TestCrawlStatus:
         data = resp.json()
         assert data["status"] == "pending"
         assert data["data"] == []
+
+    @pytest.mark.asyncio
+    async def test_crawl_status_etag_not_modified(self, client: AsyncClient, auth_headers, db_session: AsyncSession, test_user):
+        """Polling with a matching If-None-Match returns 304 with no body."""
+        job = Job(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            type="crawl",
+            status="running",
+            config={"url": "https://example.com"},
+            total_pages=5,
+            completed_pages=1,
+        )
+        db_session.add(job)
+        await db_session.flush()
+
+        resp = await client.get(f"/v1/crawl/{job.id}", headers=auth_headers)
+        assert resp.status_code == 200
+        etag = resp.headers["etag"]
+        assert etag.startswith('W/"')
+
+        resp = await client.get(
+            f"/v1/crawl/{job.id}", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+        job.completed_pages = 2
+        await db_session.flush()
+
+        resp = await client.get(
+            f"/v1/crawl/{job.id}", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
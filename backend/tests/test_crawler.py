@@ -0,0 +1,116 @@
+"""Unit tests for app.services.crawler — frontier bookkeeping."""
+
+import pytest
+
+from app.schemas.crawl import CrawlRequest
+from app.services.crawler import WebCrawler
+
+
+class _FakePipeline:
+    """Queues commands and runs them against _FakeRedis on execute()."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._ops.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        ops, self._ops = self._ops, []
+        return [await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in ops]
+
+
+class _FakeRedis:
+    """The handful of set/hash commands the crawler frontier uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def sadd(self, key, *members):
+        s = self.data.setdefault(key, set())
+        before = len(s)
+        s.update(members)
+        return len(s) - before
+
+    async def smismember(self, key, members):
+        s = self.data.get(key, set())
+        return [int(m in s) for m in members]
+
+    async def scard(self, key):
+        return len(self.data.get(key, set()))
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+
+def _crawler(max_pages: int) -> WebCrawler:
+    crawler = WebCrawler(
+        "job",
+        CrawlRequest(url="https://example.com", max_pages=max_pages, respect_robots_txt=False),
+    )
+    crawler._redis = _FakeRedis()
+    return crawler
+
+
+class TestAddToFrontier:
+
+    @pytest.mark.asyncio
+    async def test_queued_urls_do_not_consume_budget(self):
+        """Re-discovered frontier URLs leave room for genuinely new ones."""
+        crawler = _crawler(max_pages=20)
+        queued = [f"https://example.com/q{i}" for i in range(10)]
+        new = [f"https://example.com/n{i}" for i in range(5)]
+
+        await crawler.add_to_frontier(queued, depth=1)
+        await crawler.add_to_frontier(queued + new, depth=2)
+
+        frontier = crawler._redis.data[crawler._frontier_key]
+        assert frontier == set(queued + new)
+        # Already-queued URLs keep the depth they were first found at
+        depths = crawler._redis.data[crawler._depth_key]
+        assert {depths[u] for u in queued} == {"1"}
+        assert {depths[u] for u in new} == {"2"}
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_new_urls(self):
+        """No more than max_pages URLs are ever queued."""
+        crawler = _crawler(max_pages=3)
+        await crawler.add_to_frontier([f"https://example.com/p{i}" for i in range(10)], depth=1)
+        assert len(crawler._redis.data[crawler._frontier_key]) == 3
+
+
+class TestLoadRobots:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status, cached", [(200, True), (404, True), (429, False), (503, False)])
+    async def test_only_definitive_responses_are_cached(self, monkeypatch, status, cached):
+        """Transient errors allow the crawl but aren't shared via Redis."""
+        crawler = _crawler(max_pages=10)
+        body = "User-agent: *\nDisallow: /private"
+
+        async def fetch(url):
+            return status, body
+        monkeypatch.setattr(WebCrawler, "_fetch_robots", lambda self, url: fetch(url))
+
+        parser = await crawler._load_robots("https://example.com")
+        assert ("robots:https://example.com" in crawler._redis.data) is cached
+        assert parser.is_allowed("*", "https://example.com/private") is (status != 200)
@@ -4,7 +4,13 @@ import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock
 
-from app.services.dedup import normalize_url, deduplicate_urls, check_redis_seen
+from app.services.dedup import (
+    DEDUP_OFFLOAD_THRESHOLD,
+    normalize_url,
+    deduplicate_urls,
+    deduplicate_urls_async,
+    check_redis_seen,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -103,6 +109,16 @@ class TestNormalizeUrl:
         result = normalize_url("https://example.com:8080/page")
         assert ":8080" in result
 
+    def test_userinfo_preserved(self):
+        """Credentials in the netloc survive normalization."""
+        result = normalize_url("https://user:pw@Example.com:443/page")
+        assert result == "https://user:pw@example.com/page"
+
+    def test_path_params_dropped(self):
+        """;params on the last path segment are dropped like the fragment."""
+        result = normalize_url("https://example.com/a;jsessionid=1?b=2")
+        assert result == "https://example.com/a?b=2"
+
     def test_double_slashes_collapsed(self):
         """Double slashes in path are collapsed to single slashes."""
         result = normalize_url("https://example.com//a//b///c")
@@ -133,6 +149,15 @@ class TestNormalizeUrl:
         result = normalize_url("   not a url at all   ")
         assert result == "not a url at all"
 
+    def test_escaped_query_values_canonicalized(self):
+        """Equivalent percent/plus encodings of a query value normalize the same."""
+        assert normalize_url("https://example.com/s?q=a%20b") == normalize_url("https://example.com/s?q=a+b")
+
+    def test_repeated_params_keep_order(self):
+        """Repeated params stay grouped in their original order after sorting."""
+        result = normalize_url("https://example.com/?b=2&a=1&b=1")
+        assert result == "https://example.com/?a=1&b=2&b=1"
+
     def test_preserves_meaningful_query_params(self):
         """Non-tracking query params are preserved and sorted."""
         url = "https://shop.example.com/search?category=books&sort=price&page=3"
@@ -219,6 +244,15 @@ class TestDeduplicateUrls:
         assert len(result) == 1
 
 
+    @pytest.mark.asyncio
+    async def test_async_matches_sync_for_large_lists(self):
+        """Lists above the offload threshold give the same result off-thread."""
+        urls = [f"https://example.com/p{i % 300}/" for i in range(DEDUP_OFFLOAD_THRESHOLD + 1)]
+        result = await deduplicate_urls_async(urls)
+        assert result == deduplicate_urls(urls)
+        assert len(result) == 300
+
+
 # ---------------------------------------------------------------------------
 # check_redis_seen
 # ---------------------------------------------------------------------------
@@ -1,16 +1,19 @@
 """Unit tests for app.services.document — type detection, PDF/DOCX extraction."""
 
 import io
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
 import pytest
 
+from app.services import document
 from app.services.document import (
+    DocumentResult,
     detect_document_type,
-    extract_pdf,
     extract_docx,
-    DocumentResult,
+    extract_pdf,
 )
 
-
 # ---------------------------------------------------------------------------
 # detect_document_type
 # ---------------------------------------------------------------------------
@@ -326,3 +329,38 @@ class TestExtractDocx:
         docx_bytes = _create_minimal_docx(["Para 1", "Para 2", "Para 3"])
         result = await extract_docx(docx_bytes)
         assert result.metadata.get("paragraph_count", 0) >= 3
+
+
+# ---------------------------------------------------------------------------
+# Process pool fallback
+# ---------------------------------------------------------------------------
+
+
+class TestRunInPool:
+
+    @pytest.fixture(autouse=True)
+    def _reset_pool(self, monkeypatch):
+        monkeypatch.setattr(document, "_pool", None)
+        monkeypatch.setattr(document, "_pool_disabled", False)
+
+    @pytest.mark.asyncio
+    async def test_daemonic_process_uses_threads(self, monkeypatch):
+        """Inside a daemonic worker no pool is created at all."""
+        monkeypatch.setattr(document.multiprocessing, "current_process", lambda: SimpleNamespace(daemon=True))
+        assert await document._run_in_pool(len, b"abc") == 3
+        assert document._pool is None
+        assert document._pool_disabled
+
+    @pytest.mark.asyncio
+    async def test_failing_pool_is_shut_down_and_not_retried(self, monkeypatch):
+        """A pool that can't run work is shut down once and never used again."""
+        broken = MagicMock()
+        broken.submit.side_effect = RuntimeError("cannot start workers")
+        monkeypatch.setattr(document, "_pool", broken)
+
+        assert await document._run_in_pool(len, b"abcd") == 4
+        broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        assert document._pool is None
+
+        assert await document._run_in_pool(len, b"ab") == 2
+        assert broken.submit.call_count == 1
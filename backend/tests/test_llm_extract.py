@@ -0,0 +1,51 @@
+"""Unit tests for app.services.llm_extract — key selection."""
+
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.llm_key import LLMKey
+from app.services.llm_extract import _get_user_llm_key
+
+
+async def _add_keys(db_session: AsyncSession, user_id, *specs):
+    for provider, is_default in specs:
+        db_session.add(LLMKey(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            provider=provider,
+            encrypted_key="enc",
+            is_default=is_default,
+        ))
+    await db_session.flush()
+
+
+class TestGetUserLlmKey:
+
+    @pytest.mark.asyncio
+    async def test_requested_provider_wins(self, db_session: AsyncSession, test_user):
+        """A key for the requested provider beats the default key."""
+        await _add_keys(db_session, test_user.id, ("openai", True), ("groq", False))
+        key = await _get_user_llm_key(db_session, test_user.id, "groq")
+        assert key.provider == "groq"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_default(self, db_session: AsyncSession, test_user):
+        """Without a matching provider the default key is used."""
+        await _add_keys(db_session, test_user.id, ("groq", False), ("openai", True))
+        key = await _get_user_llm_key(db_session, test_user.id, "anthropic")
+        assert key.provider == "openai"
+        key = await _get_user_llm_key(db_session, test_user.id)
+        assert key.provider == "openai"
+
+    @pytest.mark.asyncio
+    async def test_any_key_when_no_default(self, db_session: AsyncSession, test_user):
+        """A user with keys but no default still gets one."""
+        await _add_keys(db_session, test_user.id, ("groq", False))
+        key = await _get_user_llm_key(db_session, test_user.id)
+        assert key.provider == "groq"
+
+    @pytest.mark.asyncio
+    async def test_no_keys(self, db_session: AsyncSession, test_user):
+        assert await _get_user_llm_key(db_session, test_user.id, "openai") is None